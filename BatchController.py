@@ -0,0 +1,363 @@
+import concurrent.futures
+import hashlib
+import json
+import os
+
+import BlockNode
+import CompressionController
+import DataController
+import IndexController
+import InlineScanner
+
+
+class BatchController:
+    def __init__(self, source_directory, output_directory=None, jobs=1,
+                 force=False, compression=(), index=False):
+        self.source_directory = source_directory
+        self.output_directory = output_directory
+        self.jobs = jobs
+        self.force = force
+        self.compression = tuple(compression)
+        self.index = index
+        self.manifest_file_name = os.path.join(
+            output_directory or source_directory, '.md2html-manifest.json'
+        )
+        self.version = self.__compute_converter_version()
+        self.manifest = self.__load_manifest()
+
+    def __compute_converter_version(self):
+        """
+        Compute version of the converter from its source code, so that
+        every change of the converter invalidates the whole manifest;
+        Every module affecting the written files is hashed, i.e. the HTML
+        code, its compressed copies and its index;
+
+        RETURNS
+        -------
+        version : str
+            Contains hash of the converter's modules;
+        """
+
+        digest = hashlib.sha256()
+        for module in (BlockNode, CompressionController, DataController,
+                       IndexController, InlineScanner):
+            with open(module.__file__, 'rb') as module_file:
+                digest.update(module_file.read())
+        return digest.hexdigest()
+
+    def __load_manifest(self):
+        """
+        Load the manifest of already converted files;
+        The manifest is ignored, if it was created by another version
+        of the converter or if the conversion is forced;
+
+        RETURNS
+        -------
+        manifest : dict
+            Contains hash, size and modification time of every source file
+            converted by the previous run;
+        """
+
+        if self.force or not os.path.exists(self.manifest_file_name):
+            return dict()
+        with open(self.manifest_file_name, 'r') as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest.get('version') != self.version:
+            return dict()
+        return manifest.get('files', dict())
+
+    def __save_manifest(self):
+        """
+        Save the manifest, the old one is replaced atomically;
+        """
+
+        temporary_file_name = self.manifest_file_name + '.tmp'
+        with open(temporary_file_name, 'w') as manifest_file:
+            json.dump(
+                {'version': self.version, 'files': self.manifest},
+                manifest_file, indent=1, sort_keys=True
+            )
+        os.replace(temporary_file_name, self.manifest_file_name)
+
+    def __find_source_files(self):
+        """
+        Walk the source directory and find all of MD files;
+
+        YIELDS
+        ------
+        relative_path : str
+            Contains path of the MD file relative to the source directory;
+        """
+
+        for directory, directories, file_names in os.walk(
+            self.source_directory
+        ):
+            directories.sort()
+            for file_name in sorted(file_names):
+                if file_name.endswith('.md'):
+                    yield os.path.relpath(
+                        os.path.join(directory, file_name),
+                        self.source_directory
+                    )
+
+    def __create_target_path(self, relative_path):
+        """
+        Create path of the HTML file, either next to the source file
+        or in the mirrored directory tree;
+
+        PARAMETERS
+        ----------
+        relative_path : str
+            Contains path of the MD file relative to the source directory;
+
+        RETURNS
+        -------
+        path : str
+            Contains path of the HTML file;
+        """
+
+        html_path = os.path.splitext(relative_path)[0] + '.html'
+        return os.path.join(
+            self.output_directory or self.source_directory, html_path
+        )
+
+    def __is_up_to_date(self, relative_path, source_path, target_path):
+        """
+        Check if the source file has to be converted again;
+        If the size and the modification time did not change, the file
+        is not even read, otherwise its hash is compared;
+        The file is converted again, if any of its compressed copies
+        or its index is missing;
+
+        PARAMETERS
+        ----------
+        relative_path : str
+            Contains path of the MD file relative to the source directory;
+        source_path, target_path : str, str
+            Contains path of the MD and the HTML file, respectively;
+
+        RETURNS
+        -------
+        value : bool
+        """
+
+        entry = self.manifest.get(relative_path)
+        if entry is None or not os.path.exists(target_path):
+            return False
+        for compression_format in self.compression:
+            if not os.path.exists(f'{target_path}.{compression_format}'):
+                return False
+        if self.index and not os.path.exists(
+            IndexController.index_file_name(target_path)
+        ):
+            return False
+        status = os.stat(source_path)
+        if (entry['size'], entry['mtime']) == (
+            status.st_size, status.st_mtime_ns
+        ):
+            return True
+        if entry['hash'] != _hash_file(source_path):
+            return False
+        entry['size'], entry['mtime'] = status.st_size, status.st_mtime_ns
+        return True
+
+    def convert_directory(self):
+        """
+        Convert all of the changed MD files in the source directory;
+        Files are converted in parallel, one file by one worker process;
+        Every worker process compresses HTML code in its own threads,
+        while the conversion of the file goes on;
+        A file which can not be converted, e.g. due to invalid UTF-8,
+        is reported and left out of the manifest, so that it is converted
+        again by the next run, while the other files are converted anyway;
+        The manifest is saved even if the run is interrupted, so that
+        the files converted until then are not converted again;
+
+        RETURNS
+        -------
+        converted, skipped : int, int
+            Contains number of converted and skipped files, respectively;
+        failed : list
+            Contains relative path and error message of every file which
+            could not be converted;
+        """
+
+        tasks = []
+        skipped = 0
+        failed = []
+        relative_paths = list(self.__find_source_files())
+        for relative_path in relative_paths:
+            source_path = os.path.join(self.source_directory, relative_path)
+            target_path = self.__create_target_path(relative_path)
+            if self.__is_up_to_date(relative_path, source_path, target_path):
+                skipped += 1
+            else:
+                tasks.append((relative_path, source_path, target_path))
+
+        source_paths = [task[1] for task in tasks]
+        target_paths = [task[2] for task in tasks]
+        compressions = [self.compression] * len(tasks)
+        indexes = [self.index] * len(tasks)
+        try:
+            if self.jobs == 1 or len(tasks) < 2:
+                results = map(
+                    _try_convert_file, source_paths, target_paths,
+                    compressions, indexes
+                )
+                self.__collect_results(tasks, results, failed)
+            else:
+                with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.jobs
+                ) as executor:
+                    results = executor.map(
+                        _try_convert_file, source_paths, target_paths,
+                        compressions, indexes,
+                        chunksize=max(1, len(tasks) // (self.jobs * 8))
+                    )
+                    self.__collect_results(tasks, results, failed)
+        finally:
+            self.manifest = {
+                relative_path: self.manifest[relative_path]
+                for relative_path in relative_paths
+                if relative_path in self.manifest
+            }
+            self.__save_manifest()
+        return len(tasks) - len(failed), skipped, failed
+
+    def __collect_results(self, tasks, results, failed):
+        """
+        Store the entry of every converted file in the manifest as soon
+        as the file is converted; the entry of a file which failed is
+        removed, since its HTML file is not up to date anymore;
+
+        PARAMETERS
+        ----------
+        tasks : list
+            Contains relative path, source path and target path of every
+            converted file;
+        results : iterable
+            Contains the result of '_try_convert_file()' of every task;
+        failed : list
+            Collects relative path and error message of every failed file;
+        """
+
+        for (relative_path, _, _), (entry, error) in zip(tasks, results):
+            if error is None:
+                self.manifest[relative_path] = entry
+            else:
+                self.manifest.pop(relative_path, None)
+                failed.append((relative_path, error))
+
+
+def _hash_file(file_name):
+    """
+    Hash contents of the file;
+
+    PARAMETERS
+    ----------
+    file_name : str
+        Contains path of the file;
+
+    RETURNS
+    -------
+    hash : str
+        Contains SHA-256 hash of the file;
+    """
+
+    with open(file_name, 'rb') as source_file:
+        return hashlib.sha256(source_file.read()).hexdigest()
+
+
+def _convert_file(source_path, target_path, compression=(), index=False):
+    """
+    Convert one MD file into the HTML file in the worker process;
+    HTML code is written chunk by chunk and compressed on the way,
+    if any compression format is given; compressed copies left by
+    a previous run in other formats are removed, since they are stale;
+    so is the index, if it is not written by this run;
+    HTML code is written under a temporary name, which replaces the HTML
+    file only once the whole file is converted;
+
+    PARAMETERS
+    ----------
+    source_path, target_path : str, str
+        Contains path of the MD and the HTML file, respectively;
+    compression : tuple
+        Contains formats of the compressed copies of the HTML file;
+    index : bool
+        Contains whether the index of the HTML file should be written;
+
+    RETURNS
+    -------
+    entry : dict
+        Contains hash, size and modification time of the source file;
+    """
+
+    status = os.stat(source_path)
+    with open(source_path, 'rb') as source_file:
+        source = source_file.read()
+    os.makedirs(os.path.dirname(target_path) or '.', exist_ok=True)
+    for compression_format in CompressionController.available_formats():
+        stale_file_name = f'{target_path}.{compression_format}'
+        if compression_format not in compression and os.path.exists(
+            stale_file_name
+        ):
+            os.remove(stale_file_name)
+    index_file_name = IndexController.index_file_name(target_path)
+    if not index and os.path.exists(index_file_name):
+        os.remove(index_file_name)
+    blocks = [] if index else None
+    fragments = DataController.convert_iter(source, blocks=blocks)
+    if compression:
+        fragments = CompressionController.CompressionController(
+            target_path, compression, is_threaded=True
+        ).compress_fragments(fragments)
+    if index:
+        fragments = IndexController.IndexController(
+            target_path, blocks
+        ).index_fragments(fragments)
+    temporary_path = target_path + '.tmp'
+    try:
+        with open(temporary_path, 'wb') as target_file:
+            for fragment in fragments:
+                target_file.write(fragment.encode())
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    os.replace(temporary_path, target_path)
+    return {
+        'hash': hashlib.sha256(source).hexdigest(),
+        'size': status.st_size,
+        'mtime': status.st_mtime_ns
+    }
+
+
+def _try_convert_file(source_path, target_path, compression=(), index=False):
+    """
+    Convert one MD file like '_convert_file()', but report the error
+    instead of raising it, so that one broken file does not stop the
+    conversion of the others;
+
+    PARAMETERS
+    ----------
+    source_path, target_path : str, str
+        Contains path of the MD and the HTML file, respectively;
+    compression : tuple
+        Contains formats of the compressed copies of the HTML file;
+    index : bool
+        Contains whether the index of the HTML file should be written;
+
+    RETURNS
+    -------
+    entry : dict or None
+        Contains hash, size and modification time of the source file,
+        None if the file could not be converted;
+    error : str or None
+        Contains the error message, None if the file was converted;
+    """
+
+    try:
+        entry = _convert_file(source_path, target_path, compression, index)
+    except Exception as error:
+        return None, f'{type(error).__name__}: {error}'
+    return entry, None
@@ -0,0 +1,50 @@
+class Line:
+    TEXT = 0
+    INDENTED = 1
+    NUMBERED = 2
+    HEADING = 3
+    QUOTE = 4
+    BULLET = 5
+
+    __slots__ = ('kind', 'text', 'marker', 'depth', 'level', 'number')
+
+    def __init__(self, kind, text, marker='', depth=0, level=0, number=0):
+        self.kind = kind
+        self.text = text
+        self.marker = marker
+        self.depth = depth
+        self.level = level
+        self.number = number
+
+    def restore(self):
+        """
+        Restore the text of the line together with its marker, e.g. '1. ',
+        which is needed if the line does not end up in the block it started;
+        The indentation of a line of code is not restored;
+
+        RETURNS
+        -------
+        text : str
+        """
+
+        if self.kind > Line.INDENTED:
+            return self.marker + self.text
+        return self.text
+
+
+class Block:
+    PARAGRAPH = 0
+    BLOCKQUOTE = 1
+    HEADING = 2
+    UNORDERED_LIST = 3
+    ORDERED_LIST = 4
+    CODE = 5
+
+    NAMES = ('paragraph', 'blockquote', 'heading', 'list', 'list', 'code')
+
+    __slots__ = ('kind', 'tag', 'lines')
+
+    def __init__(self, kind, tag, lines):
+        self.kind = kind
+        self.tag = tag
+        self.lines = lines
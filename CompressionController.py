@@ -0,0 +1,212 @@
+import bz2
+import lzma
+import os
+import queue
+import threading
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def available_formats():
+    """
+    List the compression formats, which can be written;
+    'br' is available only if the 'brotli' package is installed;
+
+    RETURNS
+    -------
+    formats : tuple
+        Contains extensions of the compressed files, e.g. 'gz';
+    """
+
+    if brotli is None:
+        return ('gz', 'bz2', 'xz')
+    return ('gz', 'bz2', 'xz', 'br')
+
+
+class CompressionController:
+    def __init__(self, file_name, formats=('gz',), is_threaded=False,
+                 buffer_size=2 ** 16, queue_size=8):
+        for compression_format in formats:
+            if compression_format not in available_formats():
+                raise ValueError(
+                    f'Unsupported compression format: {compression_format}'
+                )
+        self.file_name = file_name
+        self.formats = tuple(formats)
+        self.is_threaded = is_threaded
+        self.buffer_size = buffer_size
+        self.queue_size = queue_size
+        self.streams = []
+
+    def __create_compressor(self, compression_format):
+        """
+        Create the incremental compressor of the format;
+        The compressed files are served as they are, so the highest
+        compression level is used, except for 'xz' whose highest presets
+        need hundreds of MiB of memory;
+
+        PARAMETERS
+        ----------
+        compression_format : str
+            Contains extension of the compressed file, e.g. 'gz';
+
+        RETURNS
+        -------
+        compress, flush : function, function
+            Contains function compressing the next block of bytes and
+            function returning the rest of the compressed data;
+        """
+
+        if compression_format == 'gz':
+            compressor = zlib.compressobj(
+                9, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+        elif compression_format == 'bz2':
+            compressor = bz2.BZ2Compressor(9)
+        elif compression_format == 'xz':
+            compressor = lzma.LZMACompressor()
+        else:
+            compressor = brotli.Compressor()
+            return compressor.process, compressor.finish
+        return compressor.compress, compressor.flush
+
+    def __open(self):
+        """
+        Open the temporary compressed file of every format and start its
+        thread, if the compression is threaded;
+        """
+
+        for compression_format in self.formats:
+            file_name = f'{self.file_name}.{compression_format}'
+            compress, flush = self.__create_compressor(compression_format)
+            stream = {
+                'file_name': file_name,
+                'file': open(file_name + '.tmp', 'wb'),
+                'compress': compress,
+                'flush': flush,
+                'blocks': None,
+                'thread': None,
+                'error': None
+            }
+            if self.is_threaded:
+                stream['blocks'] = queue.Queue(self.queue_size)
+                stream['thread'] = threading.Thread(
+                    target=self.__compress_blocks, args=(stream,), daemon=True
+                )
+                stream['thread'].start()
+            self.streams.append(stream)
+
+    def __compress_blocks(self, stream):
+        """
+        Compress the blocks of one format in its own thread until None
+        is received; the compressors release the GIL, so the conversion
+        goes on meanwhile;
+        After an error the blocks are still received, so that the converting
+        thread is never blocked by the full queue;
+
+        PARAMETERS
+        ----------
+        stream : dict
+            Contains the compressed file, its compressor and its queue;
+        """
+
+        for block in iter(stream['blocks'].get, None):
+            if stream['error'] is None:
+                try:
+                    stream['file'].write(stream['compress'](block))
+                except Exception as error:
+                    stream['error'] = error
+
+    def __feed(self, block):
+        """
+        Pass the block of bytes to the compressor of every format;
+
+        PARAMETERS
+        ----------
+        block : bytes
+            Contains the next block of HTML code;
+        """
+
+        for stream in self.streams:
+            if self.is_threaded:
+                stream['blocks'].put(block)
+            else:
+                stream['file'].write(stream['compress'](block))
+
+    def __close(self, is_complete):
+        """
+        Finish the compressed files; complete files replace the previous
+        compressed files atomically, incomplete ones are removed, so that
+        a partially compressed file is never served;
+
+        PARAMETERS
+        ----------
+        is_complete : bool
+            Contains whether all of HTML code was compressed;
+        """
+
+        error = None
+        for stream in self.streams:
+            if stream['thread'] is not None:
+                stream['blocks'].put(None)
+                stream['thread'].join()
+            try:
+                if stream['error'] is not None:
+                    raise stream['error']
+                if is_complete:
+                    stream['file'].write(stream['flush']())
+            except Exception as stream_error:
+                error = error or stream_error
+            stream['file'].close()
+            if is_complete and error is None:
+                os.replace(stream['file_name'] + '.tmp', stream['file_name'])
+            else:
+                os.remove(stream['file_name'] + '.tmp')
+        self.streams = []
+        if error is not None:
+            raise error
+
+    def compress_fragments(self, fragments, encoding='utf-8'):
+        """
+        Pass the fragments of HTML code through, while they are compressed
+        into '<file_name>.gz' and the files of the other formats;
+        Fragments are collected into blocks of 'buffer_size' bytes, so that
+        the compressors are not called for every chunk;
+        The compressed files are finished once all of the fragments are
+        passed through;
+
+        PARAMETERS
+        ----------
+        fragments : iterable
+            Contains fragments of HTML code, e.g. HTML code of the chunks;
+        encoding : str
+            Contains encoding of the compressed HTML code;
+
+        YIELDS
+        ------
+        fragment : str
+            Contains the same fragment of HTML code;
+        """
+
+        is_complete = False
+        try:
+            self.__open()
+            buffer = []
+            buffered = 0
+            for fragment in fragments:
+                yield fragment
+                data = fragment.encode(encoding)
+                buffer.append(data)
+                buffered += len(data)
+                if buffered >= self.buffer_size:
+                    self.__feed(b''.join(buffer))
+                    buffer = []
+                    buffered = 0
+            self.__feed(b''.join(buffer))
+            is_complete = True
+        finally:
+            self.__close(is_complete)
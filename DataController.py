@@ -1,223 +1,964 @@
+import array
+import collections
+import concurrent.futures
+import functools
+import html as markup
+import itertools
+import locale
+import mmap
+import os
 import re as regex
+import time
+
+import BlockNode
+import CompressionController
+import IndexController
+import InlineScanner
+import StageProfiler
 
 
 class DataController:
-    def __init__(self, file_name='./input.txt'):
+    HAS_WHITESPACE = 1
+    HAS_BLOCK_TAGS = 2
+    HAS_INLINE_TAGS = 4
+    HAS_LINK_KEYS = 8
+    IS_CODE = 16
+
+    def __init__(self, file_name='./input.txt', source=None,
+                 memory_map=False, profiler=None, work_budget=None,
+                 encoding=None):
         self.file_name = file_name
+        self.profiler = profiler
+        self.work_budget = work_budget
+        self.blank_lines_regex = regex.compile(rb'\n(?:[ \t\r\f\v]*\n)+')
         self.link_references_regex = regex.compile(
-            r'(\[[\S\s]+\])\:[\s]+\<?((http|https)\:\/\/'
+            r'\]\:[\s]+\<?((http|https)\:\/\/'
             r'?[a-zA-Z0-9\.\/\?\:@\-_=#]+\.[a-zA-Z]'
             r'{2,6}[a-zA-Z0-9\.\&\/\?\:@\-_=#]*)\>?'
         )
+        self.link_key_regex = regex.compile(r'\[[^\[\]]+\]')
+        self.following_link_key_regex = regex.compile(r'\ *(\[[^\[\]]+\])')
+        self.ordered_list_regex = regex.compile(r'([1-9]+)\.\ ')
+        self.heading_regex = regex.compile(r'#{1,6}\ ')
         self.first_level_tags = {
-            '> ': '<blockquote>',
-            '###### ': '<h6>',
-            '##### ': '<h5>',
-            '#### ': '<h4>',
-            '### ': '<h3>',
-            '## ': '<h2>',
-            '# ': '<h1>',
-            '- ': '<ul>',
-            '* ': '<ul>',
-            '+ ': '<ul>',
-            '!OL!': '<ol>',
-            '!CODE!': '<pre><code>'
+            '>': self.__classify_quote,
+            '#': self.__classify_heading,
+            '-': self.__classify_bullet,
+            '*': self.__classify_bullet,
+            '+': self.__classify_bullet
+        }
+        self.first_level_tags.update(
+            dict.fromkeys('123456789', self.__classify_numbered)
+        )
+        self.line_block_tags = {
+            BlockNode.Line.NUMBERED: (BlockNode.Block.ORDERED_LIST, '<ol>'),
+            BlockNode.Line.INDENTED: (BlockNode.Block.CODE, '<pre><code>'),
+            BlockNode.Line.QUOTE: (BlockNode.Block.BLOCKQUOTE, '<blockquote>'),
+            BlockNode.Line.BULLET: (BlockNode.Block.UNORDERED_LIST, '<ul>')
         }
-        self.second_level_tags = {
-            '***': '<strong><em>',
-            '**_': '<strong><em>',
-            '*__': '<strong><em>',
-            '___': '<strong><em>',
-            '__*': '<strong><em>',
-            '_**': '<strong><em>',
-            '~~': '<del>',
-            '**': '<strong>',
-            '__': '<strong>',
-            '*': '<em>',
-            '_': '<em>',
-            '`': '<code>'
+        self.heading_tags = ('<h1>', '<h2>', '<h3>', '<h4>', '<h5>', '<h6>')
+        self.chunk_stages = {
+            'find_features': self.__find_features,
+            'build_code_block': self.__build_code_block,
+            'create_line': self.__create_lines,
+            'strip_line': self.__strip_lines,
+            'process_inline_tags': self.__process_inline_tags_in_lines,
+            'inject_link_tags': self.__inject_link_tags_in_lines,
+            'build_block': self.__build_block,
+            'render_block': self.__render_block
         }
-        self.used_second_level_tags = set()
-        self.links = dict()
+        self.inline_scanner = InlineScanner.InlineScanner()
+        self.context = self.__create_context()
+        self.is_memory_mapped = memory_map
+        self.memory_map = None
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        self.block_offsets = array.array('q')
+
+        if self.is_memory_mapped:
+            self.__map_source_file()
+        elif source is None and self.file_name is not None:
+            with open(self.file_name, 'r') as input_file:
+                source = input_file.read()
+
+        if source is not None:
+            self.__load_source(self.context, source)
+
+    def __create_context(self, profiler=None, work_budget=None, blocks=None):
+        """
+        Create the state of one conversion; the profiler and the work budget
+        given to the constructor are used, unless others are given;
+
+        PARAMETERS
+        ----------
+        profiler : StageProfiler
+            Collects statistics of every stage, if given;
+        work_budget : int
+            Contains number of steps the conversion may spend;
+        blocks : list
+            Collects every rendered block, if given, see 'IndexController';
+
+        RETURNS
+        -------
+        context : ConversionContext
+        """
+
+        if profiler is None:
+            profiler = self.profiler
+        if work_budget is None:
+            work_budget = self.work_budget
+        return ConversionContext(
+            profiler=profiler, work_budget=work_budget, blocks=blocks
+        )
+
+    def __load_source(self, context, source):
+        """
+        Prepare the source text for the conversion;
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
+        source : str
+            Contains MD text;
+        """
+
+        context.lines = source
+        if context.profiler is None:
+            self.__remove_blank_line_duplicates(context)
+            self.__convert_to_array(context)
+            self.__process_link_references(context)
+        else:
+            self.__profile_document_stages(context)
 
-        with open(self.file_name, 'r') as input_file:
-            self.source_file_contents = input_file.read()
+    def __profile_document_stages(self, context):
+        """
+        Run the stages preparing the whole document and record them
+        in the profiler;
 
-        self.__remove_blank_line_duplicates()
-        self.__convert_to_array()
-        self.__process_link_references()
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
+        """
+
+        for stage in (self.__remove_blank_line_duplicates,
+                      self.__convert_to_array,
+                      self.__process_link_references):
+            lines_in = context.lines
+            if isinstance(lines_in, str):
+                lines_in = [lines_in]
+            else:
+                lines_in = list(lines_in)
+            start = time.perf_counter()
+            stage(context)
+            seconds = time.perf_counter() - start
+            lines_out = context.lines
+            if isinstance(lines_out, str):
+                lines_out = [lines_out]
+            context.profiler.record(
+                stage.__name__[2:], 'document', seconds, lines_in, lines_out
+            )
 
-    def __remove_blank_line_duplicates(self):
+    def __remove_blank_line_duplicates(self, context):
         """
         Trim redundant whitespaces between blocks of text;
         Leave only one empty line between blocks of text;
+        Blank lines at the beginning are removed, but the indentation
+        of the first line is kept, since it may be a line of code;
+        Trailing whitespaces of the last line of every block are removed,
+        so that the streaming can send the block out as soon as the blank
+        line closing it is read, see '__normalize_lines()';
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
+        """
+
+        source = '\n\n'.join(
+            block.rstrip() for block in
+            regex.sub(r'\n\s*\n', '\n\n', context.lines).split('\n\n')
+        )
+        leading = source[:len(source) - len(source.lstrip())]
+        context.lines = source[leading.rfind('\n') + 1:]
+
+    def __normalize_lines(self, lines):
+        """
+        Streaming counterpart of '__remove_blank_line_duplicates()';
+        Leave only one empty line between blocks of text;
+        Trim blank lines at the very beginning of the text and trailing
+        whitespaces of the last line of every block;
+        Only the last non-blank line is held back until it is known whether
+        it ends the block; the blank line closing the block is yielded
+        right away, so that the block can be converted before the next
+        block is read;
+
+        PARAMETERS
+        ----------
+        lines : iterable
+            Contains lines of the source text, with or without line endings;
+
+        YIELDS
+        ------
+        line : str
+            Contains normalized line;
         """
 
-        source = regex.sub(r'\n\s*\n', '\n\n', self.source_file_contents)
-        self.source_file_contents = source.strip()
+        previous = None
+        for line in lines:
+            if line[-1:] == '\n':
+                line = line[:-1]
+            if not line.strip():
+                if previous is not None:
+                    yield previous.rstrip()
+                    yield ''
+                    previous = None
+                continue
+            if previous is not None:
+                yield previous
+            previous = line
+
+        if previous is not None:
+            yield previous.rstrip()
 
-    def __convert_to_array(self):
+    def __convert_to_array(self, context):
         """
         Convert the string representation of the source file
         into the array representation;
         Reverse the array, so that we can use .pop() method
         with time complexity O(1);
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
         """
 
-        self.source_file_contents = list(
-            reversed(self.source_file_contents.split('\n'))
-        )
+        context.lines = list(reversed(context.lines.split('\n')))
+
+    def __map_source_file(self):
+        """
+        Map the source file into the memory instead of reading it;
+        Only offsets of the blocks of text are kept in the memory,
+        see '__index_blocks()', and link references are collected
+        right away, see '__index_link_references()';
+        """
+
+        with open(self.file_name, 'rb') as input_file:
+            if os.fstat(input_file.fileno()).st_size == 0:
+                return
+            self.memory_map = mmap.mmap(
+                input_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        self.__index_blocks()
+        self.__index_link_references()
 
-    def __process_link_references(self):
+    def __index_blocks(self):
+        """
+        Store the start and the end offset of every block of text, i.e.
+        of the text between two runs of blank lines, into a flat array;
+        Blank lines containing other whitespaces than ASCII ones are left
+        inside the blocks, they are collapsed by '__normalize_lines()';
+        """
+
+        position = 0
+        for separator in self.blank_lines_regex.finditer(self.memory_map):
+            self.block_offsets.append(position)
+            self.block_offsets.append(separator.start())
+            position = separator.end()
+        self.block_offsets.append(position)
+        self.block_offsets.append(len(self.memory_map))
+
+    def __decode(self, start, end):
+        """
+        Decode a part of the mapped file and normalize its line endings
+        the same way as reading the file in the text mode does;
+
+        PARAMETERS
+        ----------
+        start, end : int, int
+            Contains offsets of the decoded part of the file;
+
+        RETURNS
+        -------
+        text : str
+            Contains decoded text;
+        """
+
+        text = self.memory_map[start:end].decode(self.encoding)
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+    def __index_link_references(self):
+        """
+        Mapped counterpart of '__process_link_references()';
+        Only the lines containing ']:' can define a link reference, so only
+        these lines are decoded; they are visited in the original order,
+        therefore the first definition of the key is kept;
+        """
+
+        position = self.memory_map.find(b']:')
+        while position != -1:
+            start = self.memory_map.rfind(b'\n', 0, position) + 1
+            end = self.memory_map.find(b'\n', position)
+            if end == -1:
+                end = len(self.memory_map)
+            for line in self.__decode(start, end).split('\n'):
+                self.__extract_link_references(self.context, line, False)
+            position = self.memory_map.find(b']:', end)
+
+    def __read_mapped_lines(self):
+        """
+        Decode the mapped file one block after another;
+        A block is decoded only when the previous one has been processed,
+        so the memory usage is bounded by the size of the largest block;
+
+        YIELDS
+        ------
+        line : str
+            Contains next line of the source file;
+        """
+
+        for index in range(0, len(self.block_offsets), 2):
+            start, end = self.block_offsets[index:index + 2]
+            yield from self.__decode(start, end).split('\n')
+            yield ''
+
+    def __process_link_references(self, context):
         """
         Process second part of a link, if 'Reference-Style Link' is used;
         'Reference-Style Link' may look like this:
             '[1]: <https://www.google.com>' or '[1]: https://www.google.com';
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
         """
 
-        for index, line in enumerate(self.source_file_contents):
-            if regex.search(self.link_references_regex, line):
-                line = self.__extract_link_references(line)
-                self.source_file_contents[index] = line
+        lines = context.lines
+        for index, line in enumerate(lines):
+            if ']:' in line:
+                lines[index] = self.__extract_link_references(context, line)
 
-    def __extract_link_references(self, line):
+    def __process_link_references_lazily(self, context, lines):
+        """
+        Streaming counterpart of '__process_link_references()';
+        References are collected as soon as they are read, therefore only
+        the references defined before their first use can be resolved;
+        If the key is defined more than once, the first definition is kept,
+        just like in the case of the whole file;
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
+        lines : iterable
+            Contains normalized lines of the source text;
+
+        YIELDS
+        ------
+        line : str
+            Contains processed line;
+        """
+
+        for line in lines:
+            if ']:' in line:
+                line = self.__extract_link_references(context, line, False)
+            yield line
+
+    def __extract_link_references(self, context, line, overwrite=True):
         """
         Separate the key and the link part of the line;
-        Create '<a href=""></a>' with the right link;
-        Store the 'KEY: LINK' value in the dictionary;
+        Store the 'KEY: LINK' value in the dictionary, which serves as
+        an index of all the references;
         Remove that reference afterwards, by setting the line to '';
 
         PARAMETERS
         ----------
+        context : ConversionContext
+            Contains state of the conversion;
         line : str
             Contains text which we'll be processing;
+        overwrite : bool
+            Contains whether an already stored key should be overwritten;
 
         RETURNS
         -------
         line : str
-            Returns only an empty string, so that
-            it won't end up in the resulting HTML code;
+            Returns an empty string, so that the reference won't end up
+            in the resulting HTML code, or the line itself if it does not
+            define any reference;
         """
 
-        line = line.strip()
-        matched_parts = regex.match(self.link_references_regex, line)
-        key = matched_parts.group(1)
-        link = matched_parts.group(2)
-        tag = f'<a href="{link}">!INNERTEXT!</a>'
-        self.links[key] = tag
+        reference = self.find_link_reference(line)
+        if reference is None:
+            return line
+        key, link = reference
+        if overwrite or key not in context.links:
+            context.links[key] = link
         return ''
 
-    def __split_into_chunks(self):
+    def __pop_source_lines(self, context):
+        """
+        Pop the lines of the source file one after another;
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
+
+        YIELDS
+        ------
+        line : str
+            Contains next line of the source file;
+        """
+
+        lines = context.lines
+        while lines:
+            yield lines.pop()
+
+    def __split_into_chunks(self, lines):
         """
         Split the whole file into smaller, processable chunks;
         Splitting occurs on '', so we basically process one block at the time;
+        Every chunk is yielded as soon as it is closed, so that the chunks
+        can be consumed lazily, one after another;
 
-        RETURNS
-        -------
-        new_data : list
-            Contains newly parsed source file;
+        PARAMETERS
+        ----------
+        lines : iterator
+            Contains lines of the source text;
+
+        YIELDS
+        ------
+        chunk : list
+            Contains chunk which is ready to be processed;
         """
 
-        new_data = []
-        while self.source_file_contents:
-            chunk = []
-            line = self.source_file_contents.pop()
-            chunk.append(line)
-            while True:
-                if not self.source_file_contents:
-                    break
-                line = self.source_file_contents.pop()
+        for line in lines:
+            chunk = [line]
+            for line in lines:
                 if line == '':
                     break
                 chunk.append(line)
             if chunk == ['']:
                 continue
-            chunk = self.__process_chunk(chunk)
-            new_data.append(chunk)
-        return new_data
+            yield chunk
+
+    def __batch_chunks(self, chunks, batch_size):
+        """
+        Group the chunks into batches of roughly the same size, so that
+        a lot of tiny chunks is sent to the worker process at once and
+        the communication overhead does not outweigh the processing itself;
+
+        PARAMETERS
+        ----------
+        chunks : iterable
+            Contains chunks which are ready to be processed;
+        batch_size : int
+            Contains minimal number of characters in one batch;
+
+        YIELDS
+        ------
+        batch : list
+            Contains consecutive chunks;
+        """
 
-    def __process_chunk(self, chunk):
+        batch = []
+        size = 0
+        for chunk in chunks:
+            batch.append(chunk)
+            size += sum(map(len, chunk))
+            if size >= batch_size:
+                yield batch
+                batch = []
+                size = 0
+        if batch:
+            yield batch
+
+    def __process_chunks_in_parallel(self, context, chunks, jobs, batch_size):
+        """
+        Process the chunks in a pool of worker processes;
+        Link references are already collected, so every worker receives
+        them only once, when it starts; the blocks recorded by the workers
+        are returned together with HTML code of their batches;
+        Only a few batches are processed at the same time and the results
+        are yielded in the original order, so the output is exactly the same
+        as if the chunks were processed one after another;
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
+        chunks : iterable
+            Contains chunks which are ready to be processed;
+        jobs : int
+            Contains number of worker processes;
+        batch_size : int
+            Contains minimal number of characters in one batch;
+
+        YIELDS
+        ------
+        html : str
+            Contains HTML code of one batch of chunks;
+        """
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_initialize_worker,
+            initargs=(
+                context.links, context.profiler is not None,
+                None if context.budget is None else context.budget.limit,
+                context.blocks is not None
+            )
+        ) as executor:
+            pending = collections.deque()
+            for batch in self.__batch_chunks(chunks, batch_size):
+                pending.append(executor.submit(_convert_batch, batch))
+                if len(pending) > 2 * jobs:
+                    yield self.__collect_batch(context, pending.popleft())
+            while pending:
+                yield self.__collect_batch(context, pending.popleft())
+
+    def __collect_batch(self, context, future):
+        """
+        Wait for the batch processed by the worker process and merge
+        the statistics of its profiler and its recorded blocks;
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
+        future : Future
+            Contains the submitted batch;
+
+        RETURNS
+        -------
+        html : str
+            Contains HTML code of the batch;
+        """
+
+        html, stats, blocks = future.result()
+        if stats is not None:
+            context.profiler.merge(stats)
+        if blocks is not None:
+            context.blocks.extend(blocks)
+        return html
+
+    def __generate_html(self, context, lines, jobs=1, size=0):
+        """
+        Split the lines into chunks and process them either one after
+        another or in parallel;
+        In parallel, every worker process has the whole work budget
+        for its share of chunks;
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
+        lines : iterator
+            Contains lines of the source text;
+        jobs : int
+            Contains number of worker processes, 1 means no parallelism;
+        size : int
+            Contains approximate number of characters of the source text,
+            used to pick the size of batches sent to the worker processes;
+
+        YIELDS
+        ------
+        html : str
+            Contains HTML code of one or more chunks;
+        """
+
+        chunks = self.__split_into_chunks(lines)
+        if jobs > 1:
+            batch_size = min(max(size // (jobs * 16), 2 ** 14), 2 ** 20)
+            yield from self.__process_chunks_in_parallel(
+                context, chunks, jobs, batch_size
+            )
+        else:
+            for chunk in chunks:
+                yield self.convert_chunks([chunk], context)
+
+    def __generate_html_deferred(self, context, lines, hold_size):
+        """
+        Split the lines into chunks and process them one after another,
+        while the link references are still being read;
+        A chunk using a key which is not defined yet, in the explicit form
+        '[Text][KEY]' or '[Text] [KEY]', is held back together with all
+        of the chunks after it, so that the order is kept; the chunk
+        is processed again once any of its missing keys is defined, and
+        released once none of them is missing or the source text ends;
+        The held chunks are bounded by 'hold_size' characters of the source
+        text; when it is exceeded, the first chunk is released as it is,
+        i.e. the keys still missing are left in the text, just like
+        in the case of the whole file;
+        The keys are never redefined, see '__extract_link_references()',
+        so HTML code of a chunk without any newly defined key is reused;
+        Only the conversion of the chunk which is released is recorded
+        in the profiler and charged to the work budget, see
+        '__convert_held_chunk()';
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
+        lines : iterator
+            Contains lines of the source text, link references are collected
+            as the lines are read;
+        hold_size : int
+            Contains maximal number of characters of the held chunks;
+
+        YIELDS
+        ------
+        html : str
+            Contains HTML code of one processed chunk;
+        """
+
+        held = collections.deque()
+        held_size = 0
+        chunks = itertools.chain(self.__split_into_chunks(lines), [None])
+        for chunk in chunks:
+            is_finished = chunk is None
+            if not is_finished:
+                size = sum(map(len, chunk))
+                held.append(
+                    (chunk, size) + self.__convert_held_chunk(context, chunk)
+                )
+                held_size += size
+            while held:
+                chunk, size, html, chunk_context, steps = held[0]
+                if chunk_context.missing_keys and not (
+                    chunk_context.missing_keys.isdisjoint(context.links)
+                ):
+                    html, chunk_context, steps = self.__convert_held_chunk(
+                        context, chunk
+                    )
+                    held[0] = (chunk, size, html, chunk_context, steps)
+                if (
+                    chunk_context.missing_keys and held_size <= hold_size
+                    and not is_finished
+                ):
+                    break
+                held.popleft()
+                held_size -= size
+                self.__release_held_chunk(context, chunk_context, steps)
+                yield html
+
+    def __convert_held_chunk(self, context, chunk):
+        """
+        Process the chunk which may be held back in its own context, which
+        shares the link references of the conversion, but collects its own
+        missing keys and statistics; the chunk may be processed again once
+        a missing key is defined, so its work is recorded only once it is
+        released, see '__release_held_chunk()';
+        The work budget of the chunk starts with the steps already spent
+        by the released chunks, so that a single chunk can not exceed it;
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
+        chunk : list
+            Contains chunk of text which we'll be processing;
+
+        RETURNS
+        -------
+        html : str
+            Contains HTML code of the chunk;
+        chunk_context : ConversionContext
+            Contains the missing keys and the statistics of the chunk;
+        steps : int
+            Contains number of steps of the work budget spent by the chunk;
+        """
+
+        chunk_context = ConversionContext(context.links)
+        chunk_context.missing_keys = set()
+        if context.profiler is not None:
+            chunk_context.profiler = StageProfiler.StageProfiler()
+        if context.budget is not None:
+            chunk_context.budget = InlineScanner.WorkBudget(
+                context.budget.limit
+            )
+            chunk_context.budget.steps = context.budget.steps
+        html = self.convert_chunks([chunk], chunk_context)
+        steps = 0
+        if context.budget is not None:
+            steps = chunk_context.budget.steps - context.budget.steps
+        return html, chunk_context, steps
+
+    def __release_held_chunk(self, context, chunk_context, steps):
+        """
+        Record the statistics of the released chunk in the profiler
+        of the conversion and charge its steps to the work budget;
+        Raises 'InlineScanner.WorkBudgetException' once the budget is used
+        up by the released chunks;
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
+        chunk_context : ConversionContext
+            Contains the statistics of the chunk;
+        steps : int
+            Contains number of steps of the work budget spent by the chunk;
+        """
+
+        if context.profiler is not None:
+            context.profiler.merge(chunk_context.profiler.stats)
+        if context.budget is not None:
+            context.budget.steps += steps
+            if context.budget.steps > context.budget.limit:
+                raise InlineScanner.WorkBudgetException(
+                    f'Work budget of {context.budget.limit} steps is used up'
+                )
+
+    def __process_chunk(self, context, chunk):
         """
         Process one chunk after another;
         All the heavy work is done here;
+        The features of the whole chunk are found first, so that the stages
+        which can not change any line of the chunk are skipped;
+        Every line is classified, then its inline tags are processed;
+        The classified lines are assembled into a 'BlockNode.Block', which
+        is finally rendered into HTML code;
+        A chunk, none of whose lines may be indented or start with a first
+        level MD tag, is a paragraph of its stripped lines, so its lines
+        are not classified at all;
+        A chunk of code skips all of the stages but its own, its lines are
+        only stripped of the indentation and escaped;
+        Every stage is called from 'chunk_stages', which are wrapped by
+        '__measure()' only if the conversion is profiled, so the profiled
+        chunks take the very same path as the others;
         Follow functions to learn more about what's happening;
 
         PARAMETERS
         ----------
+        context : ConversionContext
+            Contains state of the conversion;
         chunk : list
             Contains chunk of text which we'll be processing;
 
         RETURNS
         -------
         chunk : list
-            Contains newly created chunk;
+            Contains lines of HTML code;
         """
 
-        for index, line in enumerate(chunk):
-            line = self.__process_trailing_whitespaces(line)
-            line = self.__process_trailing_numbers(line)
-            line = self.__process_inline_link_tag(line)
-            line = self.__process_inline_link_tag(line, 'EmailOrWeb')
-            line = self.__process_images(line)
-            line = self.__inject_link_tags(line)
-            chunk[index] = line
+        stages = self.chunk_stages
+        records = None
+        if context.profiler is not None:
+            records = []
+            stages = self.__measure_stages(records)
+        features = stages['find_features'](chunk)
+        if features & self.IS_CODE:
+            block = stages['build_code_block'](chunk)
+        else:
+            if features & (self.HAS_WHITESPACE | self.HAS_BLOCK_TAGS):
+                lines = stages['create_line'](
+                    chunk, features & self.HAS_WHITESPACE
+                )
+                texts = None
+                if features & self.HAS_INLINE_TAGS:
+                    texts = [line.text for line in lines]
+            else:
+                lines = None
+                texts = stages['strip_line'](chunk)
+            if features & self.HAS_INLINE_TAGS:
+                texts = stages['process_inline_tags'](context, texts)
+            if features & self.HAS_LINK_KEYS and (
+                context.links or context.missing_keys is not None
+            ):
+                texts = stages['inject_link_tags'](context, texts)
+            block = stages['build_block'](lines, texts)
+        chunk = stages['render_block'](block)
+
+        if records is not None:
+            chunk_type = BlockNode.Block.NAMES[block.kind]
+            for stage, seconds, lines_in, lines_out in records:
+                context.profiler.record(
+                    stage, chunk_type, seconds, lines_in, lines_out
+                )
+        if context.blocks is not None:
+            self.__record_block(context, block, chunk)
+        return chunk
+
+    def __measure_stages(self, records):
+        """
+        Wrap every stage of '__process_chunk()' by '__measure()', so that
+        the profiled chunk is processed by the very same code as the others,
+        only its stages are recorded;
 
-        chunk = self.__process_first_level_tags(chunk)
+        PARAMETERS
+        ----------
+        records : list
+            Collects the stage, its duration and its lines;
 
-        for index, line in enumerate(chunk):
-            line = self.__unlabel_line(line)
-            line = self.__process_second_level_tags(line)
-            line = self.__correct_tags(line)
-            chunk[index] = line
+        RETURNS
+        -------
+        stages : dict
+            Contains the measured stage by its name, see 'chunk_stages';
+        """
 
-        return chunk
+        return {
+            stage: functools.partial(self.__measure, records, stage, function)
+            for stage, function in self.chunk_stages.items()
+        }
 
-    def __process_trailing_whitespaces(self, line):
+    def __measure(self, records, stage, function, *arguments):
         """
-        Take care of trailing whitespaces by either removing them
-        or by creating a place for '<code>' tag;
+        Call one stage of the profiled chunk and record its duration and
+        the lines going in and out; the lines going in are the last list
+        of lines, or the block, among the arguments; the type of the chunk
+        is not known until the block is built, so the records are passed
+        to the profiler afterwards;
+        Stripping the lines of a plain paragraph is recorded as 'create_line',
+        since it replaces the classification of the lines;
 
         PARAMETERS
         ----------
-        line : str
-            Contains text which we'll be processing;
+        records : list
+            Collects the stage, its duration and its lines;
+        stage : str
+            Contains name of the stage;
+        function : function
+            Contains the stage;
+        arguments : tuple
+            Contains arguments of the stage;
 
         RETURNS
         -------
-        line : str
-            Contains text which was processed;
+        result : object
+            Contains the result of the stage;
         """
 
-        spaces, tabs = self.__count_whitespaces(line)
-        spaces, line = self.__convert_tabs_to_spaces(spaces, tabs, line)
-        if spaces < 4:
-            line = line.strip()
-        else:
-            line = self.__create_special_tag_marking(line, '!CODE!', 4)
-        return line
-
-    def __process_trailing_numbers(self, line):
+        start = time.perf_counter()
+        result = function(*arguments)
+        seconds = time.perf_counter() - start
+        lines_in = [
+            argument for argument in arguments
+            if isinstance(argument, (list, BlockNode.Block))
+        ][-1]
+        if stage == 'strip_line':
+            stage = 'create_line'
+        records.append((
+            stage, seconds, self.__create_stage_lines(lines_in),
+            self.__create_stage_lines(result)
+        ))
+        return result
+
+    def __create_stage_lines(self, value):
         """
-        Take care of trailing numbers by creating a place for '<ol>' tag;
+        Create the lines of text going in or out of the stage, so that
+        the profiler can count their bytes;
 
         PARAMETERS
         ----------
-        line : str
-            Contains text which we'll be processing;
+        value : object
+            Contains the lines, the classified lines, the block or the
+            features of the chunk;
 
         RETURNS
         -------
-        line : str
-            Contains text which was processed;
+        lines : list
+            Contains lines of text, none for the features;
         """
 
-        if regex.match(r'^[1-9]+\.\ ', line):
-            line = self.__create_special_tag_marking(line, '!OL!', 3)
-        return line
+        if isinstance(value, int):
+            return []
+        if isinstance(value, BlockNode.Block):
+            return value.lines
+        return [
+            line.text if isinstance(line, BlockNode.Line) else line
+            for line in value
+        ]
 
-    def __process_images(self, line):
+    def __record_block(self, context, block, chunk):
         """
-        Process MD image tag;
+        Record the rendered block, so that its offset in the HTML file can be
+        computed without parsing HTML code again, see 'IndexController';
+        Headings are recorded together with their level and HTML code of
+        their text;
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
+        block : BlockNode.Block
+            Contains the rendered block;
+        chunk : list
+            Contains lines of HTML code of the block;
+        """
+
+        name = block.tag[1:block.tag.index('>')]
+        level, title = 0, None
+        if block.kind == BlockNode.Block.HEADING:
+            level = self.heading_tags.index(block.tag) + 1
+            title = ' '.join(line.strip() for line in block.lines)
+        context.blocks.append(
+            (name, level, title, sum(map(len, chunk)) + len(chunk))
+        )
+
+    def __find_features(self, chunk):
+        """
+        Find which features the lines of the chunk have at once, instead of
+        checking every line in every stage; the stages, which can not change
+        any line of the chunk, are skipped then;
+        Only the first character of every line is looked at, the rest is
+        searched in the joined chunk by the built-in string methods, one
+        character by one scan, which is several times faster than a single
+        scan by a regex;
+        The chunk has whitespace if any of its lines starts with a whitespace
+        or it contains a tab anywhere, since tabs are converted;
+        It has block tags if any of its lines starts with a character
+        selecting a first level MD tag, see 'first_level_tags', or with
+        a whitespace, which is stripped before the tag;
+        It has inline tags if it contains any character a tag may begin
+        with, see 'InlineScanner.scan()', and link keys if it contains '[';
+        A chunk, all of whose lines are indented, is code and none of its
+        other features matter, since its text is never processed;
+
+        PARAMETERS
+        ----------
+        chunk : list
+            Contains chunk of text which we'll be processing;
+
+        RETURNS
+        -------
+        features : int
+            Contains bitmask of 'HAS_WHITESPACE', 'HAS_BLOCK_TAGS',
+            'HAS_INLINE_TAGS' and 'HAS_LINK_KEYS', or just 'IS_CODE';
+        """
+
+        if chunk[0][:1].isspace() and all(map(self.__is_indented, chunk)):
+            return self.IS_CODE
+
+        features = 0
+        first_level_tags = self.first_level_tags
+        for line in chunk:
+            first_character = line[:1]
+            if first_character in first_level_tags:
+                features |= self.HAS_BLOCK_TAGS
+            elif first_character.isspace():
+                features |= self.HAS_WHITESPACE | self.HAS_BLOCK_TAGS
+        text = '\n'.join(chunk)
+        if '\t' in text:
+            features |= self.HAS_WHITESPACE
+        if (
+            '[' in text or '<' in text or '*' in text
+            or '_' in text or '~' in text or '`' in text
+        ):
+            features |= self.HAS_INLINE_TAGS
+            if '[' in text:
+                features |= self.HAS_LINK_KEYS
+        return features
+
+    def __is_indented(self, line):
+        """
+        Find whether the line is a line of code, i.e. whether it is indented
+        by 4 or more spaces, the same way as in '__create_line()'; only the
+        first 4 characters have to be looked at, since a tab within them
+        completes the indentation;
 
         PARAMETERS
         ----------
@@ -226,210 +967,231 @@ class DataController:
 
         RETURNS
         -------
-        line : str
-            Contains text which was processed;
+        is_indented : bool
         """
 
-        return self.__process_inline_link_tag(line, 'Image')
+        indentation = line[:4]
+        return indentation == '    ' or indentation.lstrip(' ')[:1] == '\t'
 
-    def __process_inline_link_tag(self, line, type_of_link='Inline'):
+    def __build_code_block(self, chunk):
         """
-        Handle both Images and Inline Links, depending on value
-        in 'type_of_link' variable;
-        Extract important parts from the given line, like URI,
-        email addresses, source file paths and AltText;
-        Build up the appropriate HTML tag with given data;
+        Assemble the chunk of code into a block without any MD processing;
+        The indentation of every line is removed, tabs in it are considered
+        as 4 spaces, and the rest of the line is kept as it is;
+        The text is escaped, so that the code is shown exactly as written,
+        e.g. '<div>' or '**kwargs' are not turned into HTML tags;
 
         PARAMETERS
         ----------
-        line : str
-            Contains text which we'll be processing;
-        type_of_link : str
-            Contains what type of data we'll be processing;
+        chunk : list
+            Contains lines of code, see '__is_indented()';
 
         RETURNS
         -------
-        line : str
-            Contains text which was processed;
+        block : BlockNode.Block
+            Contains the block of code;
         """
 
-        if type_of_link == 'Inline':
-            regex_patterns = [
-                regex.compile(
-                    r'(\[[\S\s]+\])\ *\(((http|https)\:\/\/'
-                    r'?[a-zA-Z0-9\.\/\?\:@\-_=#]+\.[a-zA-Z]'
-                    r'{2,6}[a-zA-Z0-9\.\&\/\?\:@\-_=#]*)\)'
-                )
-            ]
-        elif type_of_link == 'Image':
-            regex_patterns = [
-                regex.compile(r'\!\[([\S\s]*)\]\(([\S\s]*)\)')
-            ]
-        else:
-            regex_patterns = [
-                regex.compile(
-                    r'\<((http|https)\:\/\/?[a-zA-Z0-9\.\/\?\:@\-_=#]'
-                    r'+\.[a-zA-Z]{2,6}[a-zA-Z0-9\.\&\/\?\:@\-_=#]*)\>'
-                ),
-                regex.compile(
-                    r'\<(\w+([\.-]?\w+)*@\w+([\.-]?\w+)*(\.\w{2,3})+)\>'
-                )
-            ]
+        lines = []
+        for line in chunk:
+            if line[:4] != '    ':
+                spaces, tabs = self.__count_whitespaces(line)
+                end = spaces + tabs
+                line = line[:end].replace('\t', '    ') + line[end:]
+            lines.append(line[4:])
+        text = '\n'.join(lines)
+        if '&' in text or '<' in text or '>' in text:
+            lines = markup.escape(text, False).split('\n')
+        block_kind, tag = self.line_block_tags[BlockNode.Line.INDENTED]
+        return BlockNode.Block(block_kind, tag, lines)
+
+    def __create_lines(self, chunk, has_whitespace=True):
+        """
+        Classify every line of the chunk, see '__create_line()';
 
-        for regex_pattern in regex_patterns:
-            if regex.search(regex_pattern, line):
-                matched_parts = regex.search(regex_pattern, line)
-                if type_of_link == 'Inline':
-                    inner_text = matched_parts.group(1).strip('[').strip(']')
-                    link = matched_parts.group(2)
-                    tag = f'<a href="{link}">{inner_text}</a>'
-                elif type_of_link == 'Image':
-                    alt_text = matched_parts.group(1)
-                    source = matched_parts.group(2)
-                    tag = f'<img src="{source}" alt="{alt_text}">'
-                else:
-                    link = matched_parts.group(1)
-                    tag = f'<a href="{link}">{link}</a>'
-                line = regex.sub(regex_pattern, tag, line)
-        return line
+        PARAMETERS
+        ----------
+        chunk : list
+            Contains chunk of text which we'll be processing;
+        has_whitespace : bool
+            Contains whether any line may start with a space or contain
+            a tab;
 
-    def __inject_link_tags(self, line):
+        RETURNS
+        -------
+        lines : list
+            Contains classified lines;
         """
-        Handle the correct replacement of MD link tag with HTML link tag;
+
+        return [self.__create_line(line, has_whitespace) for line in chunk]
+
+    def __strip_lines(self, chunk):
+        """
+        Strip the lines of the chunk, none of which may start with a first
+        level MD tag, so they do not have to be classified;
 
         PARAMETERS
         ----------
-        line : str
-            Contains text which we'll be processing;
+        chunk : list
+            Contains chunk of text which we'll be processing;
 
         RETURNS
         -------
-        line : str
-            Contains text which was processed;
+        texts : list
+            Contains the lines without the surrounding whitespaces;
         """
 
-        if regex.search(r'(\[[\S\s]+\])[ ]*(\[[\S\s]+\])*', line):
-            for key in self.links:
-                if key in line:
-                    line = self.__inject_link_text(line, key).strip()
-        return line
+        return [line.strip() for line in chunk]
 
-    def __inject_link_text(self, line, key):
+    def __create_line(self, line, has_whitespace=True):
         """
-        Inject the correct link text between the opening and closing link tag;
-        Replace MD Tag with HTML Tag;
+        Classify the line by its beginning, so that every line is classified
+        exactly once and the block is assembled without rescanning the line;
+        A line indented by 4 or more spaces (one tab is considered as
+        4 spaces) is a line of code, the indentation is removed;
+        Whitespaces around any other line are removed and its first character
+        selects the only first level MD tag the line may start with,
+        see 'first_level_tags';
 
         PARAMETERS
         ----------
         line : str
             Contains text which we'll be processing;
-        key : str
-            Contains text reference to the link;
+        has_whitespace : bool
+            Contains whether the line may start with a space or contain
+            a tab; if not, the indentation is neither counted nor converted;
 
         RETURNS
         -------
+        line : BlockNode.Line
+            Contains the kind of the line and its text without the MD tag;
+        """
+
+        spaces = 0
+        if has_whitespace:
+            spaces, tabs = self.__count_whitespaces(line)
+            spaces, line = self.__convert_tabs_to_spaces(spaces, tabs, line)
+            if spaces >= 4:
+                return BlockNode.Line(
+                    BlockNode.Line.INDENTED, line[4:], line[:4], spaces
+                )
+        line = line.strip()
+        classify = self.first_level_tags.get(line[:1])
+        if classify is not None:
+            classified = classify(line, spaces)
+            if classified is not None:
+                return classified
+        return BlockNode.Line(BlockNode.Line.TEXT, line, depth=spaces)
+
+    def __classify_quote(self, line, depth):
+        """
+        Classify the line starting with '>';
+
+        PARAMETERS
+        ----------
         line : str
-            Contains text which was processed;
+            Contains text without the surrounding whitespaces;
+        depth : int
+            Contains indentation of the line;
+
+        RETURNS
+        -------
+        line : BlockNode.Line or None
+            Contains the quoted line, None if the line is not quoted;
         """
 
-        key_index = line.find(key)
-        start_point = key_index - 1
-        while True:
-            if line[start_point] == '[':
-                break
-            start_point -= 1
-        substring = line[start_point:]
-        end_point = substring.find(']')
-        inner_link_text = substring[1:end_point]
-        end_point = key_index + len(key) + 1
-        tag = line[start_point:end_point]
-        self.links[key] = self.links[key].replace(
-            '!INNERTEXT!', inner_link_text
-        )
-        line = line.replace(tag, self.links[key])
-        return line
+        if line[1:2] == ' ':
+            return BlockNode.Line(
+                BlockNode.Line.QUOTE, line[2:], line[:2], depth
+            )
+        return None
 
-    def __process_first_level_tags(self, chunk):
+    def __classify_heading(self, line, depth):
         """
-        Process all of first level MD tags and replaces it by HTML tags;
+        Classify the line starting with '#', the number of '#' followed
+        by a space is the level of the heading;
 
         PARAMETERS
         ----------
-        chunk : list
-            Contains currently processed chunk;
+        line : str
+            Contains text without the surrounding whitespaces;
+        depth : int
+            Contains indentation of the line;
 
         RETURNS
         -------
-        chunk : list
-            Contains newly created chunk;
+        line : BlockNode.Line or None
+            Contains the heading, None if the line is not a heading;
         """
 
-        for tag in self.first_level_tags:
-            if self.__is_matching(chunk, tag):
-                chunk = self.__label_chunk(
-                    self.__convert_first_level_tags(chunk, tag)
-                )
-        if not self.__is_labeled(chunk):
-            chunk = self.__process_unlabeled_chunk(chunk)
-
-        return chunk
+        matched_parts = self.heading_regex.match(line)
+        if matched_parts is None:
+            return None
+        end = matched_parts.end()
+        return BlockNode.Line(
+            BlockNode.Line.HEADING, line[end:], line[:end], depth,
+            level=end - 1
+        )
 
-    def __process_second_level_tags(self, line):
+    def __classify_bullet(self, line, depth):
         """
-        Process all of second level MD tags and replaces it by HTML tags;
+        Classify the line starting with '-', '*' or '+';
 
         PARAMETERS
         ----------
         line : str
-            Contains currently processed line;
+            Contains text without the surrounding whitespaces;
+        depth : int
+            Contains indentation of the line;
 
         RETURNS
         -------
-        line : str
-            Contains newly created line;
+        line : BlockNode.Line or None
+            Contains the item of the list, None if the line is not an item;
         """
 
-        for tag in self.second_level_tags:
-            if tag in line:
-                how_many = line.count(tag)
-                if how_many % 2 != 0:
-                    continue
-                self.used_second_level_tags.add(self.second_level_tags[tag])
-                line = line.replace(tag, self.second_level_tags[tag])
-        return line
+        if line[1:2] == ' ':
+            return BlockNode.Line(
+                BlockNode.Line.BULLET, line[2:], line[:2], depth
+            )
+        return None
 
-    def __process_unlabeled_chunk(self, chunk):
+    def __classify_numbered(self, line, depth):
         """
-        Process the chunk which was previously not labeled;
-        This essentially encloses the unlabeled chunk in '<p>' tag;
-        Also label the chunk, just for the sake of consistency;
+        Classify the line starting with a digit;
 
         PARAMETERS
         ----------
-        chunk : list
-            Contains currently processed chunk;
+        line : str
+            Contains text without the surrounding whitespaces;
+        depth : int
+            Contains indentation of the line;
 
         RETURNS
         -------
-        chunk : list
-            Contains newly created chunk;
+        line : BlockNode.Line or None
+            Contains the numbered line, None if the line is not numbered;
         """
 
-        for index, line in enumerate(chunk):
-            line = line + '<br>'
-            chunk[index] = line
-
-        chunk[0] = '<p>' + chunk[0]
-        chunk[-1] = chunk[-1] + '</p>'
-        chunk = self.__label_chunk(chunk)
-        return chunk
+        matched_parts = self.ordered_list_regex.match(line)
+        if matched_parts is None:
+            return None
+        end = matched_parts.end()
+        return BlockNode.Line(
+            BlockNode.Line.NUMBERED, line[end:], line[:end], depth,
+            number=int(matched_parts.group(1))
+        )
 
-    def __correct_tags(self, line):
+    def __process_inline_tags(self, context, line):
         """
-        Correct all faulty HTML tags after the '__replace_nth_occurence()';
+        Process MD inline link, autolink, image and second level tags;
+        All of them are found in a single scan of the line,
+        see 'InlineScanner' to learn more;
 
         PARAMETERS
         ----------
+        context : ConversionContext
+            Contains state of the conversion;
         line : str
             Contains text which we'll be processing;
 
@@ -439,31 +1201,68 @@ class DataController:
             Contains text which was processed;
         """
 
-        for tag in self.used_second_level_tags:
-            line = self.__replace_nth_occurence(
-                line, tag, self.__create_closing_html_tag(tag)
-            )
-        return line
+        return self.inline_scanner.scan(line, True, context.budget)
 
-    def __replace_nth_occurence(self, line, tag, replacement):
+    def __process_inline_tags_in_lines(self, context, texts):
         """
-        Replace every second occurrence of given tag;
-        Due to the reason that '__process_second_level_tags' method
-        encloses every MD formatted text only in opening tags,
-        we have to correct every second occurrence of the given tag;
-        It finds the first occurrence of the tag and from index of the
-        first occurrence, it then finds the second occurrence, which then
-        replaces by the correct tag;
+        Process inline tags of every line of the chunk,
+        see '__process_inline_tags()';
 
         PARAMETERS
         ----------
+        context : ConversionContext
+            Contains state of the conversion;
+        texts : list
+            Contains texts of the lines;
+
+        RETURNS
+        -------
+        texts : list
+            Contains texts which were processed;
+        """
+
+        return [self.__process_inline_tags(context, text) for text in texts]
+
+    def __inject_link_tags_in_lines(self, context, texts):
+        """
+        Inject link tags into every line of the chunk,
+        see '__inject_link_tags()';
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
+        texts : list
+            Contains texts of the lines;
+
+        RETURNS
+        -------
+        texts : list
+            Contains texts which were processed;
+        """
+
+        return [self.__inject_link_tags(context, text) for text in texts]
+
+    def __inject_link_tags(self, context, line):
+        """
+        Handle the correct replacement of MD link tag with HTML link tag;
+        Every '[...]' in the line is looked up in the index of references
+        only once, so the line is scanned only once no matter how many
+        references are defined;
+        Both '[Text][KEY]' and '[Text] [KEY]' use the given text,
+        the shortened '[KEY]' uses the key itself as the text of the link;
+        Keys of '[Text][KEY]' and '[Text] [KEY]', which are not defined,
+        are collected in 'missing_keys' of the context, if it is not None,
+        see '__generate_html_deferred()'; the shortened '[KEY]' is not,
+        since any text in square brackets, e.g. '- [ ] todo', looks like it
+        and holding every such chunk back would stall the stream;
+
+        PARAMETERS
+        ----------
+        context : ConversionContext
+            Contains state of the conversion;
         line : str
             Contains text which we'll be processing;
-        tag : str
-            Contains the tag which we'll be replacing;
-        replacement : str
-            Contains the closing tag, which will be inserted
-            in the position of 'tag' parameter;
 
         RETURNS
         -------
@@ -471,71 +1270,129 @@ class DataController:
             Contains text which was processed;
         """
 
-        find = line.find(tag)
-        is_found = find != -1
-        while is_found:
-            find = line.find(tag, find + len(tag))
-            if find == -1:
-                break
-            line = line[:find] + replacement + line[find + len(tag):]
-            find = line.find(tag, find + len(tag))
-            is_found = find != -1
+        links = context.links
+        missing_keys = context.missing_keys
+        if '[' not in line or not links and missing_keys is None:
+            return line
+
+        pieces = []
+        position = 0
+        matched_parts = self.link_key_regex.search(line)
+        while matched_parts:
+            text = matched_parts.group()
+            start, end = matched_parts.span()
+            key_parts = self.following_link_key_regex.match(line, end)
+            if key_parts is not None and key_parts.group(1) in links:
+                link = links[key_parts.group(1)]
+                end = key_parts.end()
+            else:
+                if missing_keys is not None and key_parts is not None:
+                    missing_keys.add(key_parts.group(1))
+                if text in links:
+                    link = links[text]
+                else:
+                    matched_parts = self.link_key_regex.search(line, end)
+                    continue
+
+            pieces.append(line[position:start])
+            pieces.append(f'<a href="{link}">{text[1:-1]}</a>')
+            position = end
+            matched_parts = self.link_key_regex.search(line, end)
 
-        return line
+        if not pieces:
+            return line
+        pieces.append(line[position:])
+        return ''.join(pieces)
 
-    def __is_matching(self, chunk, tag):
+    def __build_block(self, lines, texts=None):
         """
-        Check if the right tag is present in the chunk;
+        Assemble the classified lines of the chunk into a block;
+        The chunk is a list or a code, if all of its lines are numbered or
+        indented, respectively; it is a blockquote, a heading or a list,
+        if all of its lines start with the same first level MD tag;
+        Otherwise it is a paragraph;
+        Only the stored classification of the lines is compared;
+        The lines, which were not classified at all, are a paragraph;
 
         PARAMETERS
         ----------
-        chunk : list
-            Contains currently processed chunk;
-        tag : str
-            Contains currently tested tag;
+        lines : list or None
+            Contains classified lines of the chunk, None if the lines were
+            not classified;
+        texts : list or None
+            Contains processed texts of the lines, None if the texts of the
+            classified lines were not processed;
 
         RETURNS
         -------
-        value : bool
-            Contains whether the chunk contains the right tag or not;
+        block : BlockNode.Block
+            Contains the kind of the block, its HTML tag and the text
+            of its lines without the MD tags;
         """
 
-        return all(elem[0:len(tag)] == tag for elem in chunk)
+        if lines is None:
+            return BlockNode.Block(BlockNode.Block.PARAGRAPH, '<p>', texts)
+        if texts is not None:
+            for line, text in zip(lines, texts):
+                line.text = text
+
+        kind = lines[0].kind
+        if kind in (BlockNode.Line.NUMBERED, BlockNode.Line.INDENTED):
+            is_uniform = all(line.kind == kind for line in lines)
+        elif kind != BlockNode.Line.TEXT:
+            marker = lines[0].marker
+            is_uniform = all(
+                line.kind == kind and line.marker == marker for line in lines
+            )
+        else:
+            is_uniform = False
 
-    def __convert_first_level_tags(self, chunk, tag):
+        if is_uniform:
+            if kind == BlockNode.Line.HEADING:
+                block_kind = BlockNode.Block.HEADING
+                tag = self.heading_tags[lines[0].level - 1]
+            else:
+                block_kind, tag = self.line_block_tags[kind]
+            return BlockNode.Block(
+                block_kind, tag, [line.text for line in lines]
+            )
+
+        return BlockNode.Block(
+            BlockNode.Block.PARAGRAPH, '<p>',
+            [line.restore() for line in lines]
+        )
+
+    def __render_block(self, block):
         """
-        Convert the first level MD tags into the HTML tags;
-        First, the MD tag removal occurs, after which the
-        HTML tag replacement takes place;
-        For example: '# Heading Level 1' will be replaced by
-        '<h1>Heading Level 1</h1>';
+        Render the block into HTML code;
+        For example: the heading block with the line 'Heading Level 1'
+        will be rendered as '<h1>Heading Level 1</h1>';
 
         PARAMETERS
         ----------
-        chunk : list
-            Contains currently processed chunk;
-        tag : str
-            Contains currently processed tag;
+        block : BlockNode.Block
+            Contains the block which we'll be rendering;
 
         RETURNS
         -------
         chunk : list
-            Contains newly created chunk;
+            Contains lines of HTML code;
         """
 
-        html_tag = self.first_level_tags[tag]
-        if html_tag == '<blockquote>':
-            for index, line in enumerate(chunk):
-                line = line + '<br>'
-                chunk[index] = line
-
-        chunk = list(map(lambda elem: elem[len(tag):], chunk))
-        if html_tag in ('<ul>', '<ol>'):
+        if block.kind in (BlockNode.Block.PARAGRAPH,
+                          BlockNode.Block.BLOCKQUOTE):
+            chunk = [line + '<br>' for line in block.lines]
+        elif block.kind in (BlockNode.Block.UNORDERED_LIST,
+                            BlockNode.Block.ORDERED_LIST):
             chunk = [
-                self.__enclose_in_html_tag(elem, '<li>') for elem in chunk
+                self.__enclose_in_html_tag(line, '<li>')
+                for line in block.lines
             ]
-        chunk[0] = html_tag + chunk[0]
-        chunk[-1] = chunk[-1] + self.__create_closing_html_tag(html_tag)
+        else:
+            chunk = list(block.lines)
+
+        chunk[0] = block.tag + chunk[0]
+        chunk[-1] = chunk[-1] + self.__create_closing_html_tag(block.tag)
         return chunk
 
     def __enclose_in_html_tag(self, elem, tag):
@@ -582,66 +1439,107 @@ class DataController:
             tag = tag[1] + '>' + tag[0] + '>'
         return tag
 
-    def __label_chunk(self, chunk):
+    def __count_whitespaces(self, line):
         """
-        Label tag where the tag replacement has already occured, in order to
-        be able to determine which chunk will be rendered as a paragraph;
+        Count trailing whitespaces for a further processing;
 
         PARAMETERS
         ----------
-        chunk : list
-            Contains currently processed chunk;
+        line : str
+            Contains text which we'll be processing;
 
         RETURNS
         -------
-        chunk : list
-            Contains newly created chunk;
+        spaces, tabs : int, int
+            Contains number of spaces or tabs, respectively;
         """
 
-        chunk[0] = '!*!' + chunk[0]
-        return chunk
+        spaces, tabs = 0, 0
 
-    def __unlabel_line(self, line):
+        for char in line:
+            if char == ' ':
+                spaces += 1
+            elif char == '\t':
+                tabs += 1
+            else:
+                break
+
+        return spaces, tabs
+
+    def __convert_tabs_to_spaces(self, spaces, tabs, line):
         """
-        Unlabel the given line;
+        Convert tabs to spaces;
+        One tab is considered as 4 spaces;
 
         PARAMETERS
         ----------
+        spaces, tabs : int, int
+            Contains number of spaces or tabs, respectively;
         line : str
             Contains text which we'll be processing;
 
         RETURNS
         -------
+        spaces : int
+            Contains number of spaces;
         line : str
             Contains text which was processed;
         """
 
-        if line[0:3] == '!*!':
-            line = line[3:]
-        return line
+        line = line.replace('\t', '    ')
+        spaces += tabs * 4
+        return spaces, line
 
-    def __is_labeled(self, chunk):
+    def __read_source_lines(self):
         """
-        Check if the chunk was labeled or not, in order to be able
-        to determine which chunk will be rendered as a paragraph;
+        Read the lines of the source file, either from the prepared array
+        or from the mapped file;
 
-        PARAMETERS
-        ----------
-        chunk : list
-            Contains currently processed chunk;
+        RETURNS
+        -------
+        lines : iterator
+            Contains lines of the source file;
+        """
+
+        if not self.is_memory_mapped:
+            return self.__pop_source_lines(self.context)
+        lines = self.__normalize_lines(self.__read_mapped_lines())
+        return self.__process_link_references_lazily(self.context, lines)
+
+    def __source_size(self):
+        """
+        Count characters of the source file, which are not processed yet;
 
         RETURNS
         -------
-        value: bool
+        size : int
         """
 
-        if chunk[0][0:3] == '!*!':
-            return True
-        return False
+        if self.is_memory_mapped:
+            return len(self.memory_map) if self.memory_map else 0
+        return sum(map(len, self.context.lines))
 
-    def __count_whitespaces(self, line):
+    def __unmap_source_file(self):
         """
-        Count trailing whitespaces for a further processing;
+        Close the mapped file, once it is converted;
+        """
+
+        if self.memory_map is not None:
+            self.memory_map.close()
+            self.memory_map = None
+        self.block_offsets = array.array('q')
+
+    def find_link_reference(self, line):
+        """
+        Find the link reference defined by the line, e.g.
+        '[1]: https://www.google.com', in linear time;
+        The line has to start with the key, i.e. with '[' after the leading
+        whitespaces, so that no prose mentioning a link is taken for
+        a definition; the key ends at the last ']:' followed by a link,
+        so only the candidates ending with ']:' are matched, from the last
+        one, and no pattern ever backtracks over the key;
+        An indented line is a line of code, which never defines a reference,
+        see '__is_indented()';
 
         PARAMETERS
         ----------
@@ -650,70 +1548,470 @@ class DataController:
 
         RETURNS
         -------
-        spaces, tabs : int, int
-            Contains number of spaces or tabs, respectively;
+        reference : tuple or None
+            Contains the key including the square brackets and the link,
+            None if the line does not define any reference;
         """
 
-        spaces, tabs = 0, 0
+        if line[:1].isspace() and self.__is_indented(line):
+            return None
+        start = len(line) - len(line.lstrip())
+        if line[start:start + 1] != '[':
+            return None
+        end = line.rfind(']:')
+        while end >= start + 2:
+            matched_parts = self.link_references_regex.match(line, end)
+            if matched_parts is not None:
+                return line[start:end + 1], matched_parts.group(1)
+            end = line.rfind(']:', 0, end)
+        return None
+
+    def convert_md_to_html(self, jobs=1, compression=(), index=False):
+        """
+        Convert MD text to HTML and write it into the file;
+        The mapped file can not be overwritten while it is read, therefore
+        HTML code is written into a temporary file, which replaces it;
 
-        for char in line:
-            if char == ' ':
-                spaces += 1
-            elif char == '\t':
-                tabs += 1
-            else:
-                break
+        PARAMETERS
+        ----------
+        jobs : int
+            Contains number of worker processes, 1 means no parallelism;
+        compression : tuple
+            Contains formats, e.g. 'gz', of the compressed copies written
+            next to the file while HTML code is written into it,
+            see 'CompressionController';
+        index : bool
+            Contains whether the byte offsets of the blocks and the sections
+            should be written next to the file, see 'IndexController';
+        """
 
-        return spaces, tabs
+        size = self.__source_size()
+        output_file_name = self.file_name
+        if self.is_memory_mapped:
+            output_file_name += '.tmp'
+        with open(output_file_name, 'w') as output_file:
+            fragments = self.__generate_html(
+                self.context, self.__read_source_lines(), jobs, size
+            )
+            if compression:
+                fragments = CompressionController.CompressionController(
+                    self.file_name, compression, is_threaded=True
+                ).compress_fragments(fragments, output_file.encoding)
+            if index:
+                self.context.blocks = []
+                fragments = IndexController.IndexController(
+                    self.file_name, self.context.blocks
+                ).index_fragments(fragments, output_file.encoding)
+            output_file.writelines(fragments)
+        if self.is_memory_mapped:
+            self.__unmap_source_file()
+            os.replace(output_file_name, self.file_name)
+
+    def render_md_to_html(self, jobs=1):
+        """
+        Convert MD text to HTML without writing it into the file;
 
-    def __convert_tabs_to_spaces(self, spaces, tabs, line):
+        PARAMETERS
+        ----------
+        jobs : int
+            Contains number of worker processes, 1 means no parallelism;
+
+        RETURNS
+        -------
+        html : str
+            Contains the same HTML code 'convert_md_to_html()' would write;
         """
-        Convert tabs to spaces;
-        One tab is considered as 4 spaces;
+
+        return ''.join(self.generate_md_to_html(jobs))
+
+    def generate_md_to_html(self, jobs=1, blocks=None):
+        """
+        Convert MD text to HTML lazily, chunk by chunk;
 
         PARAMETERS
         ----------
-        spaces, tabs : int, int
-            Contains number of spaces or tabs, respectively;
-        line : str
-            Contains text which we'll be processing;
+        jobs : int
+            Contains number of worker processes, 1 means no parallelism;
+        blocks : list
+            Collects every rendered block before HTML code containing it
+            is yielded, if given, see 'IndexController';
+
+        YIELDS
+        ------
+        html : str
+            Contains HTML code of one or more chunks;
+        """
+
+        if blocks is not None:
+            self.context.blocks = blocks
+        size = self.__source_size()
+        yield from self.__generate_html(
+            self.context, self.__read_source_lines(), jobs, size
+        )
+        if self.is_memory_mapped:
+            self.__unmap_source_file()
+
+    def generate_text(self, text, jobs=1, profiler=None, work_budget=None,
+                      blocks=None):
+        """
+        Convert another MD text in memory lazily, chunk by chunk;
+        All of the state of the conversion is kept in its own
+        'ConversionContext', this controller is only read, therefore one
+        warm controller can convert many texts at once, e.g. in a pool
+        of threads; the file given to the constructor is left untouched;
+
+        PARAMETERS
+        ----------
+        text : str
+            Contains MD text;
+        jobs : int
+            Contains number of worker processes, 1 means no parallelism;
+        profiler : StageProfiler
+            Collects statistics of every stage, if given; the profiler given
+            to the constructor is used otherwise, which is not thread-safe;
+        work_budget : int
+            Contains number of steps the conversion may spend; the budget
+            given to the constructor is used otherwise;
+        blocks : list
+            Collects every rendered block before HTML code containing it
+            is yielded, if given, see 'IndexController';
+
+        YIELDS
+        ------
+        html : str
+            Contains HTML code of one or more chunks;
+        """
+
+        context = self.__create_context(profiler, work_budget, blocks)
+        self.__load_source(
+            context, text.replace('\r\n', '\n').replace('\r', '\n')
+        )
+        size = sum(map(len, context.lines))
+        yield from self.__generate_html(
+            context, self.__pop_source_lines(context), jobs, size
+        )
+
+    def convert_text(self, text, jobs=1, profiler=None, work_budget=None):
+        """
+        Convert another MD text in memory with this controller, so that
+        long-lived processes do not have to prepare a new controller
+        for every text; see 'generate_text()';
+
+        PARAMETERS
+        ----------
+        text : str
+            Contains MD text;
+        jobs : int
+            Contains number of worker processes, 1 means no parallelism;
+        profiler : StageProfiler
+            Collects statistics of every stage, if given;
+        work_budget : int
+            Contains number of steps the conversion may spend;
 
         RETURNS
         -------
-        spaces : int
-            Contains number of spaces;
-        line : str
-            Contains text which was processed;
+        html : str
+            Contains HTML code;
         """
 
-        line = line.replace('\t', '    ')
-        spaces += tabs * 4
-        return spaces, line
+        return ''.join(self.generate_text(text, jobs, profiler, work_budget))
 
-    def __create_special_tag_marking(self, line, marking, start_point):
+    def convert_chunks(self, chunks, context=None):
         """
-        Create a special tag marking for a further processing;
+        Process the given chunks, which were split but not processed yet;
+        Used by the worker processes of the parallel conversion;
 
         PARAMETERS
         ----------
-        line : str
-            Contains text which we'll be processing;
-        marking : str
-            Contains a string which will be used as a special marking;
-        start_point : int
-            Contains how many characters should be replaced in an original line
+        chunks : list
+            Contains consecutive chunks;
+        context : ConversionContext
+            Contains state of the conversion, e.g. its link references,
+            the state of the document given to the constructor if None;
 
         RETURNS
         -------
+        html : str
+            Contains HTML code of all of the chunks;
+        """
+
+        if context is None:
+            context = self.context
+        return ''.join(
+            line + '\n'
+            for chunk in chunks
+            for line in self.__process_chunk(context, chunk)
+        )
+
+    def prepare_lines(self, lines, context):
+        """
+        Normalize the lines and collect their link references lazily,
+        the same way as 'stream_md_to_html()' does; the lines defining
+        a reference are turned into '';
+        Once all of the lines are consumed, the context holds the same
+        link references as the context of the whole document would,
+        see 'ShardController';
+
+        PARAMETERS
+        ----------
+        lines : iterable
+            Contains lines of the source text, e.g. an opened file;
+        context : ConversionContext
+            Collects the link references;
+
+        YIELDS
+        ------
         line : str
-            Contains text which was processed;
+            Contains prepared line;
         """
 
-        line = marking + line[start_point:]
-        return line
+        lines = self.__normalize_lines(lines)
+        yield from self.__process_link_references_lazily(context, lines)
 
-    def convert_md_to_html(self):
-        with open(self.file_name, 'w') as input_file:
-            for chunk in self.__split_into_chunks():
-                for line in chunk:
-                    input_file.write(line + '\n')
+    def generate_prepared_lines(self, lines, context, jobs=1, size=0):
+        """
+        Convert a consecutive part of the lines given by 'prepare_lines()'
+        lazily, chunk by chunk, with the link references of the context;
+        The part has to start at the beginning of a chunk, then HTML code
+        of the consecutive parts joined together is exactly HTML code
+        of the whole document;
+
+        PARAMETERS
+        ----------
+        lines : iterable
+            Contains prepared lines;
+        context : ConversionContext
+            Contains state of the conversion, e.g. its link references;
+        jobs : int
+            Contains number of worker processes, 1 means no parallelism;
+        size : int
+            Contains approximate number of characters of the lines;
+
+        YIELDS
+        ------
+        html : str
+            Contains HTML code of one or more chunks;
+        """
+
+        yield from self.__generate_html(context, iter(lines), jobs, size)
+
+    def stream_md_to_html(self, lines, hold_size=0):
+        """
+        Convert MD text to HTML in a streaming fashion;
+        Lines are consumed lazily and HTML code of every chunk is yielded
+        as soon as the chunk is closed by a blank line, so the memory usage
+        is bounded by the size of the largest chunk;
+        Only the link references defined before their first use are resolved,
+        unless the chunks using a key defined later may be held back;
+        Every stream has its own 'ConversionContext';
+
+        PARAMETERS
+        ----------
+        lines : iterable
+            Contains lines of the source text, e.g. an opened file;
+        hold_size : int
+            Contains maximal number of characters of the chunks held back
+            until the keys they use are defined, 0 means that no chunk
+            is held, see '__generate_html_deferred()';
+
+        YIELDS
+        ------
+        html : str
+            Contains HTML code of one processed chunk;
+        """
+
+        context = self.__create_context()
+        lines = self.__normalize_lines(lines)
+        lines = self.__process_link_references_lazily(context, lines)
+        if hold_size > 0:
+            yield from self.__generate_html_deferred(context, lines, hold_size)
+        else:
+            yield from self.__generate_html(context, lines)
+
+
+class ConversionContext:
+    __slots__ = (
+        'lines', 'links', 'profiler', 'budget', 'blocks', 'missing_keys'
+    )
+
+    def __init__(self, links=None, profiler=None, work_budget=None,
+                 blocks=None):
+        self.lines = []
+        self.links = dict() if links is None else links
+        self.profiler = profiler
+        self.budget = None
+        if work_budget is not None:
+            self.budget = InlineScanner.WorkBudget(work_budget)
+        self.blocks = blocks
+        self.missing_keys = None
+
+
+_shared_data_controller = None
+_worker_data_controller = None
+_worker_context = None
+
+
+def _get_shared_data_controller():
+    """
+    Get the warm 'DataController' shared by all of the conversions
+    in memory, so that its patterns and tables are prepared only once;
+    Threads racing to create it may create it more than once, which
+    is harmless, since the controller is never changed by a conversion;
+
+    RETURNS
+    -------
+    data_controller : DataController
+    """
+
+    global _shared_data_controller
+    if _shared_data_controller is None:
+        _shared_data_controller = DataController(None)
+    return _shared_data_controller
+
+
+def _initialize_worker(links, is_profiled=False, work_budget=None,
+                       is_indexed=False):
+    """
+    Create the 'DataController' of the worker process and the context
+    of the converted document;
+
+    PARAMETERS
+    ----------
+    links : dict
+        Contains link references of the converted document;
+    is_profiled : bool
+        Contains whether the stages should be profiled;
+    work_budget : int
+        Contains number of steps the worker may spend on the document,
+        None means no limit;
+    is_indexed : bool
+        Contains whether the rendered blocks should be recorded;
+    """
+
+    global _worker_data_controller, _worker_context
+    profiler = StageProfiler.StageProfiler() if is_profiled else None
+    blocks = [] if is_indexed else None
+    _worker_data_controller = DataController(None)
+    _worker_context = ConversionContext(links, profiler, work_budget, blocks)
+
+
+def _convert_batch(batch):
+    """
+    Process one batch of chunks in the worker process;
+
+    PARAMETERS
+    ----------
+    batch : list
+        Contains consecutive chunks;
+
+    RETURNS
+    -------
+    html : str
+        Contains HTML code of the batch;
+    stats : dict or None
+        Contains statistics collected by the profiler since the previous
+        batch, if the stages are profiled;
+    blocks : list or None
+        Contains blocks recorded since the previous batch, if the blocks
+        are recorded;
+    """
+
+    html = _worker_data_controller.convert_chunks(batch, _worker_context)
+    stats = blocks = None
+    profiler = _worker_context.profiler
+    if profiler is not None:
+        stats, profiler.stats = profiler.stats, dict()
+    if _worker_context.blocks is not None:
+        blocks, _worker_context.blocks = _worker_context.blocks, []
+    return html, stats, blocks
+
+
+def convert(text, encoding='utf-8', jobs=1, profiler=None, work_budget=None):
+    """
+    Convert MD text to HTML in memory, without touching the filesystem;
+    Line endings are normalized the same way as when the text is read
+    from the file;
+
+    PARAMETERS
+    ----------
+    text : str or bytes
+        Contains MD text; bytes are decoded using 'encoding';
+    encoding : str
+        Contains encoding of the text, if it is given as bytes;
+    jobs : int
+        Contains number of worker processes, 1 means no parallelism;
+    profiler : StageProfiler
+        Collects statistics of every stage, if given;
+    work_budget : int
+        Contains number of steps the conversion may spend, None means
+        no limit, see 'InlineScanner.scan()';
+
+    RETURNS
+    -------
+    html : str or bytes
+        Contains HTML code; bytes are returned if bytes were given;
+    """
+
+    html = ''.join(convert_iter(text, encoding, jobs, profiler, work_budget))
+    if isinstance(text, (bytes, bytearray)):
+        html = html.encode(encoding)
+    return html
+
+
+def convert_iter(text, encoding='utf-8', jobs=1, profiler=None,
+                 work_budget=None, blocks=None):
+    """
+    Convert MD text to HTML in memory lazily, so that HTML code of every
+    chunk can be written out before the next chunk is processed;
+    All of the calls share one warm 'DataController', it is safe to call
+    this function from many threads at once;
+
+    PARAMETERS
+    ----------
+    text : str or bytes
+        Contains MD text; bytes are decoded using 'encoding';
+    encoding : str
+        Contains encoding of the text, if it is given as bytes;
+    jobs : int
+        Contains number of worker processes, 1 means no parallelism;
+    profiler : StageProfiler
+        Collects statistics of every stage, if given;
+    work_budget : int
+        Contains number of steps the conversion may spend, None means
+        no limit, see 'InlineScanner.scan()';
+    blocks : list
+        Collects every rendered block, if given, see 'IndexController';
+
+    YIELDS
+    ------
+    html : str
+        Contains HTML code of one or more chunks;
+    """
+
+    if isinstance(text, (bytes, bytearray)):
+        text = text.decode(encoding)
+    yield from _get_shared_data_controller().generate_text(
+        text, jobs, profiler, work_budget, blocks
+    )
+
+
+def convert_many(documents, encoding='utf-8'):
+    """
+    Convert many MD documents to HTML in memory;
+    Every document is converted in its own 'ConversionContext', therefore
+    link references of one document never leak into another;
+
+    PARAMETERS
+    ----------
+    documents : iterable
+        Contains MD documents, either str or bytes;
+    encoding : str
+        Contains encoding of the documents given as bytes;
+
+    RETURNS
+    -------
+    htmls : list
+        Contains HTML code of every document, in the same order;
+    """
+
+    return [convert(document, encoding) for document in documents]
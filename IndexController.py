@@ -0,0 +1,165 @@
+import json
+import os
+
+
+class IndexController:
+    def __init__(self, file_name, blocks):
+        self.file_name = file_name
+        self.index_file_name = index_file_name(file_name)
+        self.blocks = blocks
+        self.encoding = 'utf-8'
+        self.offsets = []
+        self.size = 0
+
+    def __locate_blocks(self, fragment, position):
+        """
+        Compute the byte offsets of the blocks rendered into the fragment
+        and move the size of the HTML file past them;
+        The blocks were recorded by the converter before the fragment was
+        passed on, together with the number of characters of their HTML code;
+        ASCII fragments have as many bytes as characters, so only the other
+        ones have to be encoded, block by block;
+
+        PARAMETERS
+        ----------
+        fragment : str
+            Contains the fragment of HTML code;
+        position : int
+            Contains number of the first block of the fragment;
+
+        RETURNS
+        -------
+        position : int
+            Contains number of the first block of the next fragment;
+        """
+
+        is_ascii = fragment.isascii()
+        start = 0
+        while position < len(self.blocks):
+            self.offsets.append(self.size)
+            length = self.blocks[position][3]
+            if is_ascii:
+                self.size += length
+            else:
+                self.size += len(
+                    fragment[start:start + length].encode(self.encoding)
+                )
+            start += length
+            position += 1
+        return position
+
+    def __create_sections(self):
+        """
+        Find the end of the section of every heading, i.e. the offset of
+        the next heading of the same or a higher level, or the end of the
+        file; the section is the heading together with its whole subtree;
+
+        RETURNS
+        -------
+        sections : list
+            Contains start and end offset, level, HTML code of the text
+            and number of the block of every heading;
+        """
+
+        sections = []
+        open_sections = []
+        for number, (name, level, title, _) in enumerate(self.blocks):
+            if not level:
+                continue
+            offset = self.offsets[number]
+            while open_sections and sections[open_sections[-1]][2] >= level:
+                sections[open_sections.pop()][1] = offset
+            open_sections.append(len(sections))
+            sections.append([offset, self.size, level, title, number])
+        return sections
+
+    def __write(self):
+        """
+        Write the index into '<file_name>.index.json'; the previous index
+        is replaced atomically;
+        """
+
+        index = {
+            'encoding': self.encoding,
+            'size': self.size,
+            'blocks': [
+                [offset, block[0]]
+                for offset, block in zip(self.offsets, self.blocks)
+            ],
+            'sections': self.__create_sections()
+        }
+        temporary_file_name = self.index_file_name + '.tmp'
+        with open(temporary_file_name, 'w') as index_file:
+            json.dump(index, index_file, separators=(',', ':'))
+        os.replace(temporary_file_name, self.index_file_name)
+
+    def index_fragments(self, fragments, encoding='utf-8'):
+        """
+        Pass the fragments of HTML code through, while the byte offsets
+        of the blocks are collected; once all of the fragments are passed
+        through, the index is written next to the HTML file, so that
+        a server can seek to a single section without reading the rest;
+        Nothing is written, if the conversion fails;
+
+        PARAMETERS
+        ----------
+        fragments : iterable
+            Contains fragments of HTML code, e.g. HTML code of the chunks;
+        encoding : str
+            Contains encoding of the HTML file;
+
+        YIELDS
+        ------
+        fragment : str
+            Contains the same fragment of HTML code;
+        """
+
+        self.encoding = encoding
+        position = 0
+        for fragment in fragments:
+            position = self.__locate_blocks(fragment, position)
+            yield fragment
+        self.__write()
+
+
+def index_file_name(file_name):
+    """
+    Create the name of the index of the HTML file;
+
+    PARAMETERS
+    ----------
+    file_name : str
+        Contains path of the HTML file;
+
+    RETURNS
+    -------
+    file_name : str
+        Contains path of the index, e.g. 'doc.html.index.json';
+    """
+
+    return file_name + '.index.json'
+
+
+def read_section(file_name, number):
+    """
+    Read one section of the HTML file, using its index;
+
+    PARAMETERS
+    ----------
+    file_name : str
+        Contains path of the HTML file;
+    number : int
+        Contains number of the section, i.e. of the heading, in the index;
+
+    RETURNS
+    -------
+    html : str
+        Contains HTML code of the heading and its whole subtree;
+    """
+
+    with open(index_file_name(file_name), 'r') as index_file:
+        index = json.load(index_file)
+    start, end = index['sections'][number][:2]
+    with open(file_name, 'rb') as html_file:
+        html_file.seek(start)
+        return html_file.read(end - start).decode(index['encoding'])
@@ -0,0 +1,514 @@
+import bisect
+import re as regex
+import string
+
+
+class WorkBudgetException(Exception):
+    pass
+
+
+class WorkBudget:
+    __slots__ = ('limit', 'steps')
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.steps = 0
+
+
+class Delimiter:
+    def __init__(self, char, count, index, can_open, can_close):
+        self.char = char
+        self.count = count
+        self.index = index
+        self.can_open = can_open
+        self.can_close = can_close
+        self.opening_tags = []
+        self.closing_tags = []
+
+    def render(self):
+        """
+        Render the delimiter run, i.e. closing tags of the emphasis it closes,
+        unused delimiters and opening tags of the emphasis it opens;
+        The latest opened emphasis is the innermost one;
+
+        RETURNS
+        -------
+        text : str
+            Contains text which replaces the delimiter run;
+        """
+
+        return (
+            ''.join(self.closing_tags)
+            + self.char * self.count
+            + ''.join(reversed(self.opening_tags))
+        )
+
+
+class InlineScanner:
+    def __init__(self):
+        self.trigger_regex = regex.compile(r'[\[\<\*_~`]')
+        self.delimiter_regexes = {
+            '*': regex.compile(r'\*+'),
+            '_': regex.compile(r'_+'),
+            '~': regex.compile(r'~+'),
+            '`': regex.compile(r'`+')
+        }
+        self.bracket_regex = regex.compile(r'[\[\]]')
+        self.link_target_regex = regex.compile(
+            r'\ *\((https?\:\/([a-zA-Z0-9\.\&\/\?\:@\-_=#]+))\)'
+        )
+        self.autolink_regex = regex.compile(
+            r'\<(https?\:\/([a-zA-Z0-9\.\&\/\?\:@\-_=#]+))\>'
+        )
+        self.domain_regex = regex.compile(r'.\.[a-zA-Z]{2}')
+        self.email_regex = regex.compile(
+            r'\<(\w+(?:[\.\-]\w+)*@\w+(?:[\.\-]\w+)*\.\w{2,3})\>'
+        )
+        self.second_level_tags = {
+            ('*', 3): '<strong><em>',
+            ('*', 2): '<strong>',
+            ('*', 1): '<em>',
+            ('_', 3): '<strong><em>',
+            ('_', 2): '<strong>',
+            ('_', 1): '<em>',
+            ('~', 2): '<del>',
+            ('`', 1): '<code>'
+        }
+        self.closing_tags = {
+            '<strong><em>': '</em></strong>',
+            '<strong>': '</strong>',
+            '<em>': '</em>',
+            '<del>': '</del>',
+            '<code>': '</code>'
+        }
+        self.punctuation = frozenset(string.punctuation)
+
+    def scan(self, line, are_links_allowed=True, budget=None):
+        """
+        Replace MD inline links, images, autolinks, code spans and emphasis
+        by HTML tags in a single left-to-right scan of the line;
+        The scan only stops at characters, where a tag may begin;
+        Text between the tags is copied as it is;
+        Emphasis delimiters are paired with openers on a stack as soon as
+        they are read, so the tags are emitted in linear time;
+        Every stop of the scan is one step of the work budget, if given;
+        Raises WorkBudgetException once the budget is used up;
+        The scanner itself is never changed by the scan, so one scanner
+        can be shared by many threads;
+
+        PARAMETERS
+        ----------
+        line : str
+            Contains text which we'll be processing;
+        are_links_allowed : bool
+            Contains whether inline links are recognized; links are not
+            allowed inside the text of another link;
+        budget : WorkBudget
+            Contains steps spent on the document so far, None means
+            no limit;
+
+        RETURNS
+        -------
+        line : str
+            Contains text which was processed;
+        """
+
+        if (
+            '[' not in line and '<' not in line and '*' not in line
+            and '_' not in line and '~' not in line and '`' not in line
+        ):
+            return line
+
+        pieces = []
+        position = 0
+        brackets = None
+        code_spans = None
+        parentheses = None
+        delimiters = []
+        openers = {'*': [], '_': [], '~': []}
+        match = self.trigger_regex.search(line)
+        while match:
+            if budget is not None:
+                budget.steps += 1
+                if budget.steps > budget.limit:
+                    raise WorkBudgetException(
+                        f'Work budget of {budget.limit} steps is used up'
+                    )
+            start = match.start()
+            trigger = match.group()
+            tag = None
+            if trigger in openers:
+                end = self.delimiter_regexes[trigger].match(line, start).end()
+                if trigger != '~' or end - start == 2:
+                    pieces.append(line[position:start])
+                    delimiter = self.__create_delimiter(
+                        line, start, end, len(pieces)
+                    )
+                    pieces.append('')
+                    delimiters.append(delimiter)
+                    self.__process_delimiter(delimiter, openers)
+                    position = end
+                match = self.trigger_regex.search(line, end)
+                continue
+            elif trigger == '`':
+                end, tag, code_spans = self.__scan_code_span(
+                    line, start, code_spans
+                )
+                if tag is None:
+                    match = self.trigger_regex.search(line, end)
+                    continue
+            elif trigger == '<':
+                end, tag = self.__scan_autolink(line, start)
+            else:
+                close, brackets = self.__find_closing_bracket(
+                    line, start, brackets
+                )
+                if start > position and line[start - 1] == '!':
+                    end, tag, parentheses = self.__scan_image(
+                        line, start - 1, close, parentheses
+                    )
+                    if tag is not None:
+                        start -= 1
+                if tag is None and are_links_allowed:
+                    end, tag = self.__scan_inline_link(
+                        line, start, close, budget
+                    )
+
+            if tag is None:
+                match = self.trigger_regex.search(line, start + 1)
+                continue
+            pieces.append(line[position:start])
+            pieces.append(tag)
+            position = end
+            match = self.trigger_regex.search(line, end)
+
+        if not pieces:
+            return line
+        for delimiter in delimiters:
+            pieces[delimiter.index] = delimiter.render()
+        pieces.append(line[position:])
+        return ''.join(pieces)
+
+    def __create_delimiter(self, line, start, end, index):
+        """
+        Create the delimiter run and decide whether it can open or close
+        the emphasis, depending on the characters around it;
+        The run followed by a whitespace can not open the emphasis,
+        the run preceded by a whitespace can not close it;
+        Underscores inside of a word, e.g. 'snake_case', are left as they are;
+
+        PARAMETERS
+        ----------
+        line : str
+            Contains text which we'll be processing;
+        start, end : int, int
+            Contains indices of the first character of the run and
+            of the first character following the run, respectively;
+        index : int
+            Contains index of the piece of text, which the run replaces;
+
+        RETURNS
+        -------
+        delimiter : Delimiter
+            Contains newly created delimiter run;
+        """
+
+        char = line[start]
+        previous = line[start - 1] if start > 0 else ' '
+        following = line[end] if end < len(line) else ' '
+        is_previous_punctuation = previous in self.punctuation
+        is_following_punctuation = following in self.punctuation
+
+        is_left_flanking = not following.isspace() and (
+            not is_following_punctuation
+            or previous.isspace() or is_previous_punctuation
+        )
+        is_right_flanking = not previous.isspace() and (
+            not is_previous_punctuation
+            or following.isspace() or is_following_punctuation
+        )
+        can_open, can_close = is_left_flanking, is_right_flanking
+        if char == '_':
+            can_open = is_left_flanking and (
+                not is_right_flanking or is_previous_punctuation
+            )
+            can_close = is_right_flanking and (
+                not is_left_flanking or is_following_punctuation
+            )
+        return Delimiter(char, end - start, index, can_open, can_close)
+
+    def __process_delimiter(self, delimiter, openers):
+        """
+        Pair the delimiter run with the nearest openers of the same kind;
+        Every pair emits the opening and the closing tag directly;
+        Unpaired openers between the pair can not be closed anymore,
+        so they are dropped from their stacks;
+        Unused part of the run becomes an opener, if it can open the emphasis;
+
+        PARAMETERS
+        ----------
+        delimiter : Delimiter
+            Contains currently processed delimiter run;
+        openers : dict
+            Contains stack of unpaired openers for every kind of delimiter;
+        """
+
+        stack = openers[delimiter.char]
+        while delimiter.can_close and delimiter.count and stack:
+            opener = stack[-1]
+            for other_stack in openers.values():
+                while other_stack and other_stack[-1].index > opener.index:
+                    other_stack.pop()
+
+            count = min(opener.count, delimiter.count, 3)
+            if delimiter.char == '~':
+                count = 2
+            tag = self.second_level_tags[(delimiter.char, count)]
+            opener.opening_tags.append(tag)
+            delimiter.closing_tags.append(self.closing_tags[tag])
+            opener.count -= count
+            delimiter.count -= count
+            if not opener.count:
+                stack.pop()
+
+        if delimiter.can_open and delimiter.count:
+            stack.append(delimiter)
+
+    def __scan_code_span(self, line, start, code_spans):
+        """
+        Try to build '<code></code>' from the code span starting
+        at the given index, e.g. '`print()`';
+        The code span is closed by the nearest run of backticks of the same
+        length and its content is left untouched;
+
+        PARAMETERS
+        ----------
+        line : str
+            Contains text which we'll be processing;
+        start : int
+            Contains index of the first backtick;
+        code_spans : dict
+            Contains indices of all backtick runs in the line for every
+            length of the run, None if not indexed yet;
+
+        RETURNS
+        -------
+        end, tag, code_spans : int, str, dict
+            Contains index right after the code span, or right after the run
+            of backticks if the code span is not closed, the HTML tag,
+            None if the code span is not closed, and the indexed runs;
+        """
+
+        if code_spans is None:
+            code_spans = dict()
+            for match in self.delimiter_regexes['`'].finditer(line, start):
+                runs = code_spans.setdefault(match.end() - match.start(), [])
+                runs.append(match.start())
+            for runs in code_spans.values():
+                runs.reverse()
+
+        end = self.delimiter_regexes['`'].match(line, start).end()
+        runs = code_spans[end - start]
+        while runs and runs[-1] <= start:
+            runs.pop()
+        if not runs:
+            return end, None, code_spans
+
+        close = runs.pop()
+        tag = self.second_level_tags[('`', 1)]
+        content = line[end:close]
+        return (
+            close + end - start,
+            tag + content + self.closing_tags[tag],
+            code_spans
+        )
+
+    def __find_closing_bracket(self, line, start, brackets):
+        """
+        Find the closing square bracket paired with the opening one;
+        If there is no other opening bracket in between, the nearest closing
+        bracket is the pair, otherwise all of the brackets in the line
+        are paired at once and the pairs are reused for the rest of the line;
+
+        PARAMETERS
+        ----------
+        line : str
+            Contains text which we'll be processing;
+        start : int
+            Contains index of the opening square bracket;
+        brackets : dict
+            Contains pairs of square brackets, None if not paired yet;
+
+        RETURNS
+        -------
+        close, brackets : int, dict
+            Contains index of the closing square bracket, -1 if there is
+            no such bracket, and pairs of square brackets;
+        """
+
+        if brackets is None:
+            close = line.find(']', start + 1)
+            if close == -1:
+                return close, dict()
+            if line.find('[', start + 1, close) == -1:
+                return close, brackets
+            brackets = self.__match_brackets(line)
+        return brackets.get(start, -1), brackets
+
+    def __match_brackets(self, line):
+        """
+        Pair every opening square bracket with its closing square bracket;
+        Brackets may be nested, e.g. '[![Image](a.png)](https://a.com)';
+
+        PARAMETERS
+        ----------
+        line : str
+            Contains text which we'll be processing;
+
+        RETURNS
+        -------
+        brackets : dict
+            Contains index of the closing bracket for every index
+            of the opening bracket which has its pair;
+        """
+
+        brackets = dict()
+        opened = []
+        for match in self.bracket_regex.finditer(line):
+            if match.group() == '[':
+                opened.append(match.start())
+            elif opened:
+                brackets[opened.pop()] = match.start()
+        return brackets
+
+    def __scan_inline_link(self, line, start, close, budget):
+        """
+        Try to build '<a href=""></a>' from the inline link
+        starting at the given index, e.g. '[Text](https://www.google.com)';
+
+        PARAMETERS
+        ----------
+        line : str
+            Contains text which we'll be processing;
+        start : int
+            Contains index of the opening square bracket;
+        close : int
+            Contains index of the paired closing square bracket;
+        budget : WorkBudget
+            Contains steps spent on the document so far, None means
+            no limit;
+
+        RETURNS
+        -------
+        end, tag : int, str
+            Contains index right after the link and the HTML tag,
+            tag is None if there is no link at the given index;
+        """
+
+        if close <= start + 1:
+            return start, None
+        matched_parts = self.link_target_regex.match(line, close + 1)
+        if matched_parts is None or not self.__is_url(matched_parts.group(2)):
+            return start, None
+
+        inner_text = line[start:close + 1].strip('[').strip(']')
+        inner_text = self.scan(inner_text, False, budget)
+        link = matched_parts.group(1)
+        return matched_parts.end(), f'<a href="{link}">{inner_text}</a>'
+
+    def __scan_image(self, line, start, close, parentheses):
+        """
+        Try to build '<img src="" alt="">' from the image
+        starting at the given index, e.g. '![AltText](image.png)';
+        The image ends at the nearest closing parenthesis; all of them are
+        indexed at once, so that the line is not searched again for every
+        unclosed image;
+
+        PARAMETERS
+        ----------
+        line : str
+            Contains text which we'll be processing;
+        start : int
+            Contains index of the exclamation mark;
+        close : int
+            Contains index of the closing square bracket paired with
+            the opening one following the exclamation mark;
+        parentheses : list
+            Contains indices of the closing parentheses following the first
+            attempted image of the line, None if not indexed yet;
+
+        RETURNS
+        -------
+        end, tag, parentheses : int, str, list
+            Contains index right after the image, the HTML tag, None if there
+            is no image at the given index, and the indexed parentheses;
+        """
+
+        if close == -1 or line[close + 1:close + 2] != '(':
+            return start, None, parentheses
+        if parentheses is None:
+            parentheses = []
+            index = line.find(')', start)
+            while index != -1:
+                parentheses.append(index)
+                index = line.find(')', index + 1)
+        index = bisect.bisect_left(parentheses, close + 2)
+        if index == len(parentheses):
+            return start, None, parentheses
+
+        end = parentheses[index]
+        alt_text = line[start + 2:close]
+        source = line[close + 2:end]
+        return end + 1, f'<img src="{source}" alt="{alt_text}">', parentheses
+
+    def __scan_autolink(self, line, start):
+        """
+        Try to build '<a href=""></a>' from the URL or the email address
+        enclosed in angle brackets starting at the given index,
+        e.g. '<https://www.google.com>' or '<name@example.com>';
+
+        PARAMETERS
+        ----------
+        line : str
+            Contains text which we'll be processing;
+        start : int
+            Contains index of the opening angle bracket;
+
+        RETURNS
+        -------
+        end, tag : int, str
+            Contains index right after the autolink and the HTML tag,
+            tag is None if there is no autolink at the given index;
+        """
+
+        matched_parts = self.autolink_regex.match(line, start)
+        if matched_parts is not None:
+            if not self.__is_url(matched_parts.group(2)):
+                return start, None
+        else:
+            matched_parts = self.email_regex.match(line, start)
+            if matched_parts is None:
+                return start, None
+
+        link = matched_parts.group(1)
+        return matched_parts.end(), f'<a href="{link}">{link}</a>'
+
+    def __is_url(self, address):
+        """
+        Check if the part of URL following 'http:/' contains a domain,
+        i.e. a dot followed by at least two letters before the first '&';
+
+        PARAMETERS
+        ----------
+        address : str
+            Contains the part of URL following 'http:/';
+
+        RETURNS
+        -------
+        value : bool
+        """
+
+        end = address.find('&')
+        if end == -1:
+            end = len(address)
+        return self.domain_regex.search(address, 0, end) is not None
@@ -1,3 +1,4 @@
+import io
 import sys
 
 
@@ -6,12 +7,14 @@ class NoTextException(Exception):
 
 
 class InputController:
-    def __init__(self, file_name='./input.txt'):
+    def __init__(self, file_name='./input.txt', is_interactive=True):
         self.file_name = file_name
+        self.block_size = 2 ** 20
 
-        self.__create_file()
-        self.__clear_file()
-        self.__print_intro_message()
+        if is_interactive:
+            self.__create_file()
+            self.__clear_file()
+            self.__print_intro_message()
 
     def __create_file(self):
         with open(self.file_name, 'w') as input_file:
@@ -21,10 +24,6 @@ class InputController:
         with open(self.file_name, 'w') as input_file:
             input_file.write('')
 
-    def __append_to_file(self, line):
-        with open(self.file_name, 'a') as input_file:
-            input_file.write(line + '\n')
-
     @staticmethod
     def __print_intro_message():
         print('Enter text in MarkDown format.')
@@ -42,11 +41,76 @@ class InputController:
             user_input = input()
             if user_input.lower() == 'exit':
                 raise NoTextException()
-            while user_input.lower() != 'exit':
-                self.__append_to_file(user_input)
-                user_input = input()
+            with open(self.file_name, 'a') as input_file:
+                while user_input.lower() != 'exit':
+                    input_file.write(user_input + '\n')
+                    user_input = input()
         except NoTextException:
             print('No Text!', file=sys.stderr)
             sys.exit(1)
         except KeyboardInterrupt:
             sys.exit(130)
+
+    def read_piped_input(self, file_name=None):
+        """
+        Read the whole input until EOF in large blocks, either from
+        the file or from the standard input;
+        Nothing is written into the intermediate file and no line
+        terminates the input, so any document can be piped in;
+
+        Raises NoTextException if the input is empty.
+
+        PARAMETERS
+        ----------
+        file_name : str
+            Contains path of the MD file, None means the standard input;
+
+        RETURNS
+        -------
+        text : bytes
+            Contains MD text, not decoded yet;
+        """
+
+        if file_name is None:
+            blocks = self.__read_blocks(sys.stdin.buffer)
+        else:
+            with open(file_name, 'rb') as input_file:
+                blocks = self.__read_blocks(input_file)
+        if not blocks:
+            raise NoTextException()
+        return b''.join(blocks)
+
+    def iterate_piped_lines(self, file_name=None):
+        """
+        Read the input line by line, either from the file or from
+        the standard input, so that the conversion may start before EOF;
+        Lines are decoded as UTF-8 and their endings are normalized;
+
+        PARAMETERS
+        ----------
+        file_name : str
+            Contains path of the MD file, None means the standard input;
+
+        YIELDS
+        ------
+        line : str
+            Contains next line of the input;
+        """
+
+        if file_name is None:
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+            try:
+                yield from stream
+            finally:
+                stream.detach()
+        else:
+            with open(file_name, 'r', encoding='utf-8') as input_file:
+                yield from input_file
+
+    def __read_blocks(self, stream):
+        blocks = []
+        block = stream.read(self.block_size)
+        while block:
+            blocks.append(block)
+            block = stream.read(self.block_size)
+        return blocks
@@ -1,8 +1,109 @@
+import io
+import os
+import sys
+
+
 class OutputController:
-    def __init__(self, file_name='./input.txt'):
+    def __init__(self, file_name='./input.txt', sink=None,
+                 is_progressive=True, buffer_size=2 ** 16):
         self.file_name = file_name
+        self.sink = sink
+        self.is_progressive = is_progressive
+        self.buffer_size = buffer_size
 
     def print_formatted_text(self):
         print('=====')
-        print(open(self.file_name, 'r').read().strip())
+        with open(self.file_name, 'r') as output_file:
+            self.__print_stripped(output_file)
         print('=====')
+
+    def __print_stripped(self, output_file):
+        """
+        Print the file block by block, without its leading and trailing
+        whitespaces, so that the whole file is never held in the memory;
+
+        PARAMETERS
+        ----------
+        output_file : file
+            Contains the opened file with HTML code;
+        """
+
+        pending = ''
+        is_leading = True
+        block = output_file.read(self.buffer_size)
+        while block:
+            if is_leading:
+                block = block.lstrip()
+                is_leading = not block
+            block = pending + block
+            stripped = block.rstrip()
+            sys.stdout.write(stripped)
+            pending = block[len(stripped):]
+            block = output_file.read(self.buffer_size)
+        sys.stdout.write('\n')
+
+    def __open_sink(self):
+        """
+        Open the sink, i.e. the standard output, the file at the given path
+        or the given binary stream;
+
+        RETURNS
+        -------
+        stream : binary stream
+        is_owned : bool
+            Contains whether the stream was opened here and has to be closed;
+        """
+
+        if self.sink is None:
+            sys.stdout.flush()
+            return sys.stdout.buffer, False
+        if isinstance(self.sink, (str, os.PathLike)):
+            return open(self.sink, 'wb', buffering=self.buffer_size), True
+        if isinstance(self.sink, io.TextIOBase):
+            self.sink.flush()
+            return self.sink.buffer, False
+        return self.sink, False
+
+    def write_html(self, fragments, encoding='utf-8'):
+        """
+        Write HTML code fragment by fragment into the sink;
+        Fragments are collected in a buffer and written by 'writelines()'
+        at once; if the output is progressive, the buffer is flushed after
+        every fragment, i.e. after every chunk, so that the consumer on the
+        other side of a pipe or a socket receives it right away;
+
+        PARAMETERS
+        ----------
+        fragments : iterable
+            Contains fragments of HTML code, e.g. HTML code of the chunks;
+        encoding : str
+            Contains encoding of the output;
+
+        RETURNS
+        -------
+        size : int
+            Contains number of written bytes;
+        """
+
+        stream, is_owned = self.__open_sink()
+        size = 0
+        buffer = []
+        buffered = 0
+        try:
+            for fragment in fragments:
+                fragment = fragment.encode(encoding)
+                buffer.append(fragment)
+                buffered += len(fragment)
+                if self.is_progressive or buffered >= self.buffer_size:
+                    stream.writelines(buffer)
+                    stream.flush()
+                    size += buffered
+                    buffer = []
+                    buffered = 0
+            stream.writelines(buffer)
+            stream.flush()
+            size += buffered
+        finally:
+            if is_owned:
+                stream.close()
+        return size
@@ -0,0 +1,255 @@
+import asyncio
+import concurrent.futures
+import signal
+import struct
+import threading
+
+import DataController
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+
+class ServerController:
+    def __init__(self, socket_path=None, host='127.0.0.1', port=None,
+                 workers=1, inline_limit=2 ** 12, request_limit=2 ** 26,
+                 work_budget=None):
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.inline_limit = inline_limit
+        self.request_limit = request_limit
+        self.work_budget = work_budget
+        self.request_header = struct.Struct('>I')
+        self.response_header = struct.Struct('>BI')
+        self.data_controller = DataController.DataController(
+            None, work_budget=work_budget
+        )
+        self.executor = None
+
+    async def __read_request(self, reader):
+        """
+        Read one length-prefixed request, i.e. 4-byte big-endian length
+        followed by MD text encoded in UTF-8;
+
+        PARAMETERS
+        ----------
+        reader : asyncio.StreamReader
+            Contains the connection of the client;
+
+        RETURNS
+        -------
+        request : bytes or None
+            Contains MD text, None if the client closed the connection;
+        """
+
+        try:
+            header = await reader.readexactly(self.request_header.size)
+        except asyncio.IncompleteReadError:
+            return None
+        (length,) = self.request_header.unpack(header)
+        if length > self.request_limit:
+            raise ValueError(f'Request of {length} bytes is too large')
+        return await reader.readexactly(length)
+
+    def __write_response(self, writer, status, body):
+        """
+        Write one response, i.e. 1-byte status, 4-byte big-endian length
+        and HTML code or the error message encoded in UTF-8;
+
+        PARAMETERS
+        ----------
+        writer : asyncio.StreamWriter
+            Contains the connection of the client;
+        status : int
+            Contains 'STATUS_OK' or 'STATUS_ERROR';
+        body : bytes
+            Contains HTML code or the error message;
+        """
+
+        writer.write(self.response_header.pack(status, len(body)) + body)
+
+    async def __convert(self, request):
+        """
+        Convert the request; small requests are converted right away by
+        the warm controller of the server, large requests are sent to
+        the pool of worker processes, so that they do not stall the others;
+        The conversion of a small request blocks all of the connections,
+        so 'inline_limit' is kept at a few KiB, about a millisecond
+        of the conversion, which is still cheaper than sending the request
+        to the worker process and back;
+
+        PARAMETERS
+        ----------
+        request : bytes
+            Contains MD text encoded in UTF-8;
+
+        RETURNS
+        -------
+        html : bytes
+            Contains HTML code encoded in UTF-8;
+        """
+
+        if len(request) <= self.inline_limit:
+            return self.data_controller.convert_text(
+                request.decode()
+            ).encode()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, _convert_request, request
+        )
+
+    async def __handle_connection(self, reader, writer):
+        """
+        Serve requests of one client until it closes the connection;
+        Requests of one connection are answered in order;
+
+        PARAMETERS
+        ----------
+        reader, writer : asyncio.StreamReader, asyncio.StreamWriter
+            Contains the connection of the client;
+        """
+
+        try:
+            while True:
+                try:
+                    request = await self.__read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError) as error:
+                    self.__write_response(
+                        writer, STATUS_ERROR, str(error).encode()
+                    )
+                    break
+                if request is None:
+                    break
+                try:
+                    html = await self.__convert(request)
+                except Exception as error:
+                    self.__write_response(
+                        writer, STATUS_ERROR, repr(error).encode()
+                    )
+                else:
+                    self.__write_response(writer, STATUS_OK, html)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, started=None):
+        """
+        Serve the clients on the Unix socket or on the TCP port until
+        SIGTERM or SIGINT is received; the server stops accepting new
+        connections then and the pool of worker processes is shut down,
+        so that no worker process outlives the server;
+
+        PARAMETERS
+        ----------
+        started : asyncio.Event
+            Is set once the server accepts connections, if given;
+        """
+
+        loop = asyncio.get_running_loop()
+        stopping = asyncio.Event()
+        signal_numbers = ()
+        if threading.current_thread() is threading.main_thread():
+            signal_numbers = (signal.SIGTERM, signal.SIGINT)
+        for signal_number in signal_numbers:
+            loop.add_signal_handler(signal_number, stopping.set)
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_initialize_worker,
+            initargs=(self.work_budget,)
+        )
+        try:
+            if self.socket_path is not None:
+                server = await asyncio.start_unix_server(
+                    self.__handle_connection, path=self.socket_path
+                )
+            else:
+                server = await asyncio.start_server(
+                    self.__handle_connection, host=self.host, port=self.port
+                )
+            async with server:
+                if started is not None:
+                    started.set()
+                await stopping.wait()
+        finally:
+            for signal_number in signal_numbers:
+                loop.remove_signal_handler(signal_number)
+            self.executor.shutdown(cancel_futures=True)
+
+    def run(self):
+        """
+        Run the server until it is terminated or interrupted;
+        """
+
+        asyncio.run(self.serve())
+
+
+async def request_conversion(reader, writer, text):
+    """
+    Send one request to the server and wait for the response;
+
+    PARAMETERS
+    ----------
+    reader, writer : asyncio.StreamReader, asyncio.StreamWriter
+        Contains the connection to the server;
+    text : str
+        Contains MD text;
+
+    RETURNS
+    -------
+    html : str
+        Contains HTML code;
+    """
+
+    request = text.encode()
+    writer.write(struct.pack('>I', len(request)) + request)
+    await writer.drain()
+    status, length = struct.unpack('>BI', await reader.readexactly(5))
+    body = (await reader.readexactly(length)).decode()
+    if status != STATUS_OK:
+        raise RuntimeError(body)
+    return body
+
+
+_worker_data_controller = None
+
+
+def _initialize_worker(work_budget=None):
+    """
+    Create the warm 'DataController' of the worker process;
+    Every request is converted in its own context, so nothing is left
+    behind by the previous request;
+    SIGINT sent to the whole process group, e.g. by Ctrl+C, is ignored,
+    the server shuts the worker process down itself;
+
+    PARAMETERS
+    ----------
+    work_budget : int
+        Contains number of steps one request may spend, None means no limit;
+    """
+
+    global _worker_data_controller
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_data_controller = DataController.DataController(
+        None, work_budget=work_budget
+    )
+
+
+def _convert_request(request):
+    """
+    Convert one large request in the worker process;
+
+    PARAMETERS
+    ----------
+    request : bytes
+        Contains MD text encoded in UTF-8;
+
+    RETURNS
+    -------
+    html : bytes
+        Contains HTML code encoded in UTF-8;
+    """
+
+    return _worker_data_controller.convert_text(request.decode()).encode()
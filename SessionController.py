@@ -0,0 +1,376 @@
+import bisect
+
+import DataController
+
+
+class ReferenceIndex(dict):
+    """
+    Index of link references, which remembers every key looked up while
+    a block is processed, so that the block can be processed again once
+    the reference of that key changes;
+    The 'None' key stands for the check whether the index is empty;
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.accessed_keys = set()
+
+    def __contains__(self, key):
+        self.accessed_keys.add(key)
+        return super().__contains__(key)
+
+    def __len__(self):
+        self.accessed_keys.add(None)
+        return super().__len__()
+
+
+class Block:
+    def __init__(self, lines, is_first, is_last, is_continuation):
+        self.lines = lines
+        self.is_first = is_first
+        self.is_last = is_last
+        self.is_continuation = is_continuation
+        self.is_left_open = False
+        self.definitions = dict()
+        self.chunks = []
+        self.keys = set()
+        self.html = ''
+
+
+class SessionController:
+    def __init__(self, text=''):
+        self.data_controller = DataController.DataController(None)
+        self.links = ReferenceIndex()
+        self.context = DataController.ConversionContext(self.links)
+        self.lines = self.__normalize_line_endings(text).split('\n')
+        self.blocks = []
+        self.starts = []
+        self.definitions = dict()
+        self.users = dict()
+        self.changed_keys = set()
+        self.dirty_blocks = set()
+        self.__replace_blocks(0, 0, 0, len(self.lines), 0)
+
+    def __normalize_line_endings(self, text):
+        """
+        Normalize line endings the same way as 'DataController.convert()';
+
+        PARAMETERS
+        ----------
+        text : str
+            Contains MD text;
+
+        RETURNS
+        -------
+        text : str
+            Contains MD text with '\\n' line endings only;
+        """
+
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+    def __find_block(self, line_number):
+        """
+        Find the block the line belongs to;
+        The blank lines following the block belong to the block as well,
+        the blank lines at the very beginning belong to the first block;
+
+        PARAMETERS
+        ----------
+        line_number : int
+            Contains index of the line;
+
+        RETURNS
+        -------
+        index : int
+            Contains index of the block;
+        """
+
+        return max(bisect.bisect_right(self.starts, line_number) - 1, 0)
+
+    def __split_into_blocks(self, start, end):
+        """
+        Split the lines into blocks of non-blank lines;
+        Blank lines separate the chunks exactly the same way,
+        no matter how many of them there are;
+
+        PARAMETERS
+        ----------
+        start, end : int, int
+            Contains range of the lines which we'll be splitting;
+
+        YIELDS
+        ------
+        start, lines : int, tuple
+            Contains index of the first line and the lines of the block;
+        """
+
+        block_start = None
+        for index in range(start, end):
+            if self.lines[index].strip():
+                if block_start is None:
+                    block_start = index
+            elif block_start is not None:
+                yield block_start, tuple(self.lines[block_start:index])
+                block_start = None
+        if block_start is not None:
+            yield block_start, tuple(self.lines[block_start:end])
+
+    def __parse_block(self, block):
+        """
+        Prepare the lines of the block just like 'DataController' does,
+        collect its link references and split it into chunks;
+        Link references are replaced by '', which splits the chunk;
+        The chunk left open at the end of the previous block continues
+        in this block, see 'DataController.__split_into_chunks()';
+
+        PARAMETERS
+        ----------
+        block : Block
+            Contains block which we'll be parsing;
+        """
+
+        lines = list(block.lines)
+        lines[-1] = lines[-1].rstrip()
+
+        definitions = dict()
+        for index, line in enumerate(lines):
+            reference = self.data_controller.find_link_reference(line)
+            if reference is not None:
+                definitions.setdefault(*reference)
+                lines[index] = ''
+        self.__register_definitions(block, definitions)
+
+        block.chunks = []
+        chunk = [''] if block.is_continuation else None
+        for line in lines:
+            if chunk is None:
+                chunk = [line]
+            elif line == '':
+                if chunk != ['']:
+                    block.chunks.append(chunk)
+                chunk = None
+            else:
+                chunk.append(line)
+        if chunk is not None and chunk != ['']:
+            block.chunks.append(chunk)
+        block.is_left_open = chunk is None
+        self.dirty_blocks.add(block)
+
+    def __register_definitions(self, block, definitions):
+        """
+        Replace link references defined by the block;
+        Keys of all of the added or removed references are remembered,
+        so that their blocks can be processed again;
+
+        PARAMETERS
+        ----------
+        block : Block
+            Contains block which defines the references;
+        definitions : dict
+            Contains new references of the block;
+        """
+
+        for key, link in block.definitions.items():
+            if definitions.get(key) != link:
+                self.definitions[key].remove(block)
+                self.changed_keys.add(key)
+        for key, link in definitions.items():
+            if block.definitions.get(key) != link:
+                self.definitions.setdefault(key, []).append(block)
+                self.changed_keys.add(key)
+        block.definitions = definitions
+
+    def __drop_block(self, block):
+        """
+        Forget the block, which is no longer part of the text;
+
+        PARAMETERS
+        ----------
+        block : Block
+            Contains removed block;
+        """
+
+        self.__register_definitions(block, dict())
+        for key in block.keys:
+            self.users[key].discard(block)
+        self.dirty_blocks.discard(block)
+
+    def __refresh_block(self, index):
+        """
+        Parse the block again, if it is no longer the first or the last
+        block or if the chunk left open by the previous block changed;
+
+        PARAMETERS
+        ----------
+        index : int
+            Contains index of the block;
+
+        RETURNS
+        -------
+        value : bool
+            Contains whether the block was parsed again;
+        """
+
+        block = self.blocks[index]
+        is_first = index == 0
+        is_last = index == len(self.blocks) - 1
+        is_continuation = index > 0 and self.blocks[index - 1].is_left_open
+        if (block.is_first, block.is_last, block.is_continuation) == (
+            is_first, is_last, is_continuation
+        ):
+            return False
+        block.is_first = is_first
+        block.is_last = is_last
+        block.is_continuation = is_continuation
+        self.__parse_block(block)
+        return True
+
+    def __replace_blocks(self, first, last, start, end, delta):
+        """
+        Replace the blocks by the blocks found in the range of lines;
+        Blocks which did not change are reused together with their HTML code;
+
+        PARAMETERS
+        ----------
+        first, last : int, int
+            Contains range of the replaced blocks;
+        start, end : int, int
+            Contains range of the lines covered by the new blocks;
+        delta : int
+            Contains change of the number of lines;
+        """
+
+        is_last = last == len(self.blocks)
+        is_continuation = first > 0 and self.blocks[first - 1].is_left_open
+        old_blocks = dict()
+        for block in self.blocks[first:last]:
+            old_blocks.setdefault((
+                block.lines, block.is_first, block.is_last,
+                block.is_continuation
+            ), []).append(block)
+
+        new_blocks = []
+        new_starts = []
+        found_blocks = list(self.__split_into_blocks(start, end))
+        for index, (block_start, lines) in enumerate(found_blocks):
+            if new_blocks:
+                is_continuation = new_blocks[-1].is_left_open
+            key = (lines, first == 0 and index == 0,
+                   is_last and index == len(found_blocks) - 1,
+                   is_continuation)
+            if old_blocks.get(key):
+                block = old_blocks[key].pop()
+            else:
+                block = Block(*key)
+                self.__parse_block(block)
+            new_blocks.append(block)
+            new_starts.append(block_start)
+
+        for blocks in old_blocks.values():
+            for block in blocks:
+                self.__drop_block(block)
+        self.blocks[first:last] = new_blocks
+        self.starts[first:last] = new_starts
+        after = first + len(new_blocks)
+        if delta:
+            self.starts[after:] = [
+                block_start + delta for block_start in self.starts[after:]
+            ]
+
+        if first > 0:
+            self.__refresh_block(first - 1)
+        while after < len(self.blocks) and self.__refresh_block(after):
+            after += 1
+
+        self.__update_links()
+        self.__render_dirty_blocks()
+
+    def __update_links(self):
+        """
+        Resolve every changed key to its first definition in the text and
+        mark the blocks which looked that key up as dirty;
+        """
+
+        was_empty = not dict.__len__(self.links)
+        for key in self.changed_keys:
+            blocks = self.definitions.get(key)
+            if not blocks:
+                self.definitions.pop(key, None)
+                link = None
+            elif len(blocks) == 1:
+                link = blocks[0].definitions[key]
+            else:
+                block = min(blocks, key=self.blocks.index)
+                link = block.definitions[key]
+            if link == dict.get(self.links, key):
+                continue
+            if link is None:
+                dict.__delitem__(self.links, key)
+            else:
+                dict.__setitem__(self.links, key, link)
+            self.dirty_blocks.update(self.users.get(key, ()))
+        self.changed_keys = set()
+
+        if was_empty != (not dict.__len__(self.links)):
+            self.dirty_blocks.update(self.users.get(None, ()))
+
+    def __render_dirty_blocks(self):
+        """
+        Process the chunks of every dirty block and remember which keys
+        of link references were looked up;
+        """
+
+        for block in self.dirty_blocks:
+            for key in block.keys:
+                self.users[key].discard(block)
+            self.links.accessed_keys = set()
+            block.html = self.data_controller.convert_chunks(
+                [list(chunk) for chunk in block.chunks], self.context
+            )
+            block.keys = self.links.accessed_keys
+            for key in block.keys:
+                self.users.setdefault(key, set()).add(block)
+        self.dirty_blocks = set()
+
+    def edit(self, start, end, text):
+        """
+        Replace the text between two positions and process only the blocks
+        affected by the change;
+
+        PARAMETERS
+        ----------
+        start, end : tuple, tuple
+            Contains '(line, column)' positions of the replaced text,
+            both counted from 0;
+        text : str
+            Contains the new text;
+        """
+
+        (start_line, start_column), (end_line, end_column) = start, end
+        text = (self.lines[start_line][:start_column]
+                + self.__normalize_line_endings(text)
+                + self.lines[end_line][end_column:])
+        new_lines = text.split('\n')
+        delta = len(new_lines) - (end_line + 1 - start_line)
+
+        first = self.__find_block(start_line)
+        last = min(self.__find_block(end_line) + 2, len(self.blocks))
+        start = self.starts[first] if first > 0 else 0
+        end = (self.starts[last] if last < len(self.blocks)
+               else len(self.lines)) + delta
+
+        self.lines[start_line:end_line + 1] = new_lines
+        self.__replace_blocks(first, last, start, end, delta)
+
+    def render(self):
+        """
+        Join the HTML code of all of the blocks;
+
+        RETURNS
+        -------
+        html : str
+            Contains the same HTML code 'DataController.convert()' returns
+            for the whole text;
+        """
+
+        return ''.join(block.html for block in self.blocks)
@@ -0,0 +1,271 @@
+import concurrent.futures
+import json
+import os
+import shutil
+
+import DataController
+
+
+class MissingShardException(Exception):
+    pass
+
+
+class ShardController:
+    def __init__(self, directory):
+        self.directory = directory
+        self.manifest_file_name = os.path.join(directory, 'manifest.json')
+
+    def __create_shard_file_name(self, number, extension):
+        """
+        Create path of the file of the shard;
+
+        PARAMETERS
+        ----------
+        number : int
+            Contains number of the shard;
+        extension : str
+            Contains '.md' for the shard, '.html' for HTML code of it;
+
+        RETURNS
+        -------
+        file_name : str
+            Contains path of the file, e.g. 'shards/shard-00003.md';
+        """
+
+        return os.path.join(self.directory, f'shard-{number:05d}{extension}')
+
+    def __load_manifest(self):
+        """
+        Load the manifest written by 'split()';
+
+        RETURNS
+        -------
+        manifest : dict
+            Contains name of the source file, link references of the whole
+            document and the number of lines and characters of every shard;
+        """
+
+        with open(
+            self.manifest_file_name, 'r', encoding='utf-8'
+        ) as manifest_file:
+            return json.load(manifest_file)
+
+    def __save_manifest(self, manifest):
+        """
+        Save the manifest, the old one is replaced atomically;
+
+        PARAMETERS
+        ----------
+        manifest : dict
+            Contains the manifest, see '__load_manifest()';
+        """
+
+        temporary_file_name = self.manifest_file_name + '.tmp'
+        with open(
+            temporary_file_name, 'w', encoding='utf-8'
+        ) as manifest_file:
+            json.dump(manifest, manifest_file, indent=1)
+        os.replace(temporary_file_name, self.manifest_file_name)
+
+    def __remove_shards(self):
+        """
+        Remove the manifest and the shards of the previous split together
+        with their HTML code, so that no stale shard is ever merged;
+        """
+
+        if not os.path.exists(self.manifest_file_name):
+            return
+        manifest = self.__load_manifest()
+        os.remove(self.manifest_file_name)
+        for number in range(len(manifest['shards'])):
+            for extension in ('.md', '.html'):
+                file_name = self.__create_shard_file_name(number, extension)
+                if os.path.exists(file_name):
+                    os.remove(file_name)
+
+    def split(self, source_file_name, shard_size=2 ** 26):
+        """
+        Cut the MD file into shards, which can be converted independently,
+        e.g. by other processes or machines;
+        The lines are normalized and the link references are collected
+        while the file is read, see 'DataController.prepare_lines()', so
+        the file is read only once and never held in the memory;
+        A shard is closed at the first blank line ending a chunk after it
+        reached 'shard_size' characters, i.e. at the very same boundaries
+        as the chunks are split on; the blank line itself is left out;
+        The shards hold the prepared lines, one line per line of the file,
+        the link references of the whole document are kept in the manifest;
+
+        PARAMETERS
+        ----------
+        source_file_name : str
+            Contains path of the MD file;
+        shard_size : int
+            Contains minimal number of characters of one shard;
+
+        RETURNS
+        -------
+        count : int
+            Contains number of shards;
+        """
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.__remove_shards()
+        data_controller = DataController.DataController(None)
+        context = DataController.ConversionContext()
+        shards = []
+        shard_file = None
+        is_chunk_open = False
+        try:
+            with open(
+                source_file_name, 'r', encoding='utf-8'
+            ) as source_file:
+                for line in data_controller.prepare_lines(
+                    source_file, context
+                ):
+                    if not is_chunk_open:
+                        is_chunk_open = True
+                    elif line == '':
+                        is_chunk_open = False
+                        if shards[-1]['size'] >= shard_size:
+                            shard_file.close()
+                            shard_file = None
+                            continue
+                    if shard_file is None:
+                        shard_file_name = self.__create_shard_file_name(
+                            len(shards), '.md'
+                        )
+                        shard_file = open(
+                            shard_file_name, 'w', encoding='utf-8',
+                            newline='\n'
+                        )
+                        shards.append({'lines': 0, 'size': 0})
+                    shard_file.write(line + '\n')
+                    shards[-1]['lines'] += 1
+                    shards[-1]['size'] += len(line) + 1
+        finally:
+            if shard_file is not None:
+                shard_file.close()
+
+        self.__save_manifest({
+            'source': os.path.abspath(source_file_name),
+            'links': context.links,
+            'shards': shards
+        })
+        return len(shards)
+
+    def convert_shard(self, number, jobs=1):
+        """
+        Convert one shard into its HTML file, e.g. 'shard-00003.html',
+        using the link references of the whole document; the HTML file
+        is written under a temporary name and replaced once it is complete;
+
+        PARAMETERS
+        ----------
+        number : int
+            Contains number of the shard;
+        jobs : int
+            Contains number of worker processes, 1 means no parallelism;
+        """
+
+        manifest = self.__load_manifest()
+        size = manifest['shards'][number]['size']
+        context = DataController.ConversionContext(manifest['links'])
+        target_file_name = self.__create_shard_file_name(number, '.html')
+        temporary_file_name = target_file_name + '.tmp'
+        with open(
+            self.__create_shard_file_name(number, '.md'), 'r',
+            encoding='utf-8', newline='\n'
+        ) as shard_file, open(temporary_file_name, 'wb') as target_file:
+            lines = (line[:-1] for line in shard_file)
+            for fragment in DataController.DataController(
+                None
+            ).generate_prepared_lines(lines, context, jobs, size):
+                target_file.write(fragment.encode('utf-8'))
+        os.replace(temporary_file_name, target_file_name)
+
+    def convert_shards(self, numbers=None, jobs=1):
+        """
+        Convert the shards on this machine; several shards are converted
+        by a pool of worker processes at once, one shard by one process,
+        a single shard is converted by all of them;
+
+        PARAMETERS
+        ----------
+        numbers : list
+            Contains numbers of the shards, None means all of the shards;
+        jobs : int
+            Contains number of worker processes, 1 means no parallelism;
+
+        RETURNS
+        -------
+        count : int
+            Contains number of converted shards;
+        """
+
+        if numbers is None:
+            numbers = range(len(self.__load_manifest()['shards']))
+        numbers = list(numbers)
+        if jobs == 1 or len(numbers) < 2:
+            for number in numbers:
+                self.convert_shard(number, jobs)
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=jobs
+            ) as executor:
+                list(executor.map(
+                    _convert_shard, [self.directory] * len(numbers), numbers
+                ))
+        return len(numbers)
+
+    def merge(self, target_file_name):
+        """
+        Concatenate HTML code of all of the shards in their order into
+        the HTML file, which is then the same as if the whole MD file was
+        converted by a single process; the HTML file is written under
+        a temporary name and replaced once it is complete;
+
+        Raises MissingShardException if any shard is not converted yet.
+
+        PARAMETERS
+        ----------
+        target_file_name : str
+            Contains path of the HTML file;
+        """
+
+        manifest = self.__load_manifest()
+        file_names = [
+            self.__create_shard_file_name(number, '.html')
+            for number in range(len(manifest['shards']))
+        ]
+        missing = [
+            file_name for file_name in file_names
+            if not os.path.exists(file_name)
+        ]
+        if missing:
+            raise MissingShardException(
+                f'{len(missing)} shards are not converted yet, e.g. '
+                f'{missing[0]}'
+            )
+
+        temporary_file_name = target_file_name + '.tmp'
+        with open(temporary_file_name, 'wb') as target_file:
+            for file_name in file_names:
+                with open(file_name, 'rb') as shard_file:
+                    shutil.copyfileobj(shard_file, target_file, 2 ** 20)
+        os.replace(temporary_file_name, target_file_name)
+
+
+def _convert_shard(directory, number):
+    """
+    Convert one shard in the worker process;
+
+    PARAMETERS
+    ----------
+    directory : str
+        Contains path of the directory of the shards;
+    number : int
+        Contains number of the shard;
+    """
+
+    ShardController(directory).convert_shard(number)
@@ -0,0 +1,114 @@
+import json
+
+
+class StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def merge(self, other):
+        """
+        Add the statistics of another run of the same stage;
+
+        PARAMETERS
+        ----------
+        other : StageStats
+            Contains the added statistics;
+        """
+
+        self.calls += other.calls
+        self.seconds += other.seconds
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+
+
+class StageProfiler:
+    def __init__(self):
+        self.stats = dict()
+
+    def record(self, stage, chunk_type, seconds, lines_in, lines_out):
+        """
+        Record one call of the stage;
+
+        PARAMETERS
+        ----------
+        stage : str
+            Contains name of the stage;
+        chunk_type : str
+            Contains type of the processed chunk, e.g. 'paragraph', or
+            'document' if the stage processes the whole document;
+        seconds : float
+            Contains duration of the call;
+        lines_in, lines_out : list, list
+            Contains lines given to the stage and returned by the stage;
+        """
+
+        stats = self.stats.get((stage, chunk_type))
+        if stats is None:
+            stats = self.stats[(stage, chunk_type)] = StageStats()
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.bytes_in += sum(len(line.encode()) for line in lines_in)
+        stats.bytes_out += sum(len(line.encode()) for line in lines_out)
+
+    def merge(self, stats):
+        """
+        Add the statistics collected by another profiler,
+        e.g. by the profiler of a worker process;
+
+        PARAMETERS
+        ----------
+        stats : dict
+            Contains statistics of the other profiler;
+        """
+
+        for key, other in stats.items():
+            self.stats.setdefault(key, StageStats()).merge(other)
+
+    def to_dict(self):
+        """
+        Convert the statistics into a dictionary suitable for JSON;
+
+        RETURNS
+        -------
+        stats : dict
+            Contains the statistics of every stage by chunk type;
+        """
+
+        result = dict()
+        for (stage, chunk_type), stats in sorted(self.stats.items()):
+            result.setdefault(stage, dict())[chunk_type] = {
+                'calls': stats.calls,
+                'seconds': stats.seconds,
+                'bytes_in': stats.bytes_in,
+                'bytes_out': stats.bytes_out
+            }
+        return result
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_table(self):
+        """
+        Format the statistics as a table, the slowest stages come first;
+
+        RETURNS
+        -------
+        table : str
+        """
+
+        rows = [
+            f'{"stage":<30} {"chunk type":<11} {"calls":>8} {"ms":>10} '
+            f'{"bytes in":>11} {"bytes out":>11}'
+        ]
+        for (stage, chunk_type), stats in sorted(
+            self.stats.items(), key=lambda item: -item[1].seconds
+        ):
+            rows.append(
+                f'{stage:<30} {chunk_type:<11} {stats.calls:>8} '
+                f'{stats.seconds * 1000:>10.2f} '
+                f'{stats.bytes_in:>11} {stats.bytes_out:>11}'
+            )
+        return '\n'.join(rows)
@@ -0,0 +1,114 @@
+import argparse
+import time
+
+import DataController
+import InlineScanner
+
+PATHOLOGICAL_LINES = {
+    'unclosed brackets': lambda size: '[' * size,
+    'reference prefixes': lambda size: '[a]: ' * size,
+    'reference without link': lambda size: '[' + 'a' * size + ']: ',
+    'nested brackets': lambda size: '[' * size + 'a' + ']' * size,
+    'unclosed images': lambda size: '![a](' * size,
+    'unclosed links': lambda size: '[a](http:/' * size,
+    'email without domain': lambda size: '<a@' + 'a.' * size,
+    'email local part': lambda size: '<' + 'a.' * size + '@',
+    'unclosed autolinks': lambda size: '<http:/' * size,
+    'unpaired emphasis': lambda size: 'a* ' * size + '*a ' * size,
+    'backtick runs': lambda size: '`' * size + ' ``' * size,
+    'mixed triggers': lambda size: '*_[<`~' * size
+}
+
+
+def generate_line(name, size):
+    """
+    Generate one pathological line followed by a reference definition,
+    so that the references are looked up as well;
+
+    PARAMETERS
+    ----------
+    name : str
+        Contains name of the pathological line, see 'PATHOLOGICAL_LINES';
+    size : int
+        Contains number of repetitions of the pathological pattern;
+
+    RETURNS
+    -------
+    text : str
+        Contains MD document;
+    """
+
+    return (
+        PATHOLOGICAL_LINES[name](size)
+        + '\n\n[a]: https://example.com/a.html\n'
+    )
+
+
+def measure(text, repeat):
+    """
+    Measure the best conversion time of the text;
+
+    PARAMETERS
+    ----------
+    text : str
+        Contains MD document;
+    repeat : int
+        Contains number of conversions;
+
+    RETURNS
+    -------
+    seconds : float
+    """
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        DataController.convert(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Conversion time of pathological lines as they grow; '
+                    'time per byte stays flat if the parsing is linear.'
+    )
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[1000, 4000, 16000, 64000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--work-budget', type=int, default=10000,
+                        help='budget of the fail-fast check, in steps')
+    arguments = parser.parse_args()
+
+    print(
+        f'{"line":<24} '
+        + ' '.join(f'{size:>10}' for size in arguments.sizes)
+        + '   ns / byte'
+    )
+    for name in PATHOLOGICAL_LINES:
+        row = []
+        for size in arguments.sizes:
+            text = generate_line(name, size)
+            row.append(measure(text, arguments.repeat) * 1e9 / len(text))
+        growth = row[-1] / row[0]
+        print(
+            f'{name:<24} '
+            + ' '.join(f'{value:>10.0f}' for value in row)
+            + f'   x{growth:.1f}'
+        )
+
+    text = generate_line('mixed triggers', arguments.sizes[-1])
+    start = time.perf_counter()
+    try:
+        DataController.convert(text, work_budget=arguments.work_budget)
+    except InlineScanner.WorkBudgetException:
+        print(
+            f'budget of {arguments.work_budget} steps: failed after '
+            f'{(time.perf_counter() - start) * 1e3:.1f} ms'
+        )
+    else:
+        print(f'budget of {arguments.work_budget} steps: not exceeded')
+
+
+if __name__ == '__main__':
+    main()
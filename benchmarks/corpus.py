@@ -0,0 +1,253 @@
+import argparse
+import random
+import sys
+
+WORDS = (
+    'markdown html parser chunk block line text link image list code quote '
+    'heading table value index stream file output input token scanner tag '
+    'alpha beta gamma delta release version module format render convert'
+).split()
+
+BLOCK_WEIGHTS = {
+    'paragraph': 8,
+    'heading': 2,
+    'blockquote': 1,
+    'unordered_list': 2,
+    'ordered_list': 1,
+    'code': 1,
+}
+
+INLINE_WEIGHTS = {
+    'plain': 24,
+    'inline_link': 2,
+    'reference_link': 2,
+    'autolink': 1,
+    'email': 1,
+    'image': 1,
+    'emphasis': 2,
+    'strong': 2,
+    'strong_emphasis': 1,
+    'strikethrough': 1,
+    'code_span': 1,
+}
+
+
+class CorpusGenerator:
+    def __init__(self, seed=0, weights=None):
+        self.generator = random.Random(seed)
+        self.block_weights = dict(BLOCK_WEIGHTS)
+        self.inline_weights = dict(INLINE_WEIGHTS)
+        for construct, weight in (weights or dict()).items():
+            if construct in self.block_weights:
+                self.block_weights[construct] = weight
+            elif construct in self.inline_weights:
+                self.inline_weights[construct] = weight
+            else:
+                raise ValueError(f'Unknown construct: {construct}')
+        self.references = set()
+
+    def __choose(self, weights):
+        """
+        Choose one construct according to its weight;
+
+        PARAMETERS
+        ----------
+        weights : dict
+            Contains weight of every construct;
+
+        RETURNS
+        -------
+        construct : str
+        """
+
+        return self.generator.choices(
+            list(weights), weights=list(weights.values())
+        )[0]
+
+    def __words(self, minimum=1, maximum=4):
+        return ' '.join(
+            self.generator.choice(WORDS)
+            for _ in range(self.generator.randint(minimum, maximum))
+        )
+
+    def __url(self):
+        return (f'https://www.{self.generator.choice(WORDS)}.com/'
+                f'{self.generator.choice(WORDS)}')
+
+    def __inline(self):
+        """
+        Generate one inline construct;
+
+        RETURNS
+        -------
+        text : str
+        """
+
+        construct = self.__choose(self.inline_weights)
+        if construct == 'plain':
+            return self.__words()
+        if construct == 'inline_link':
+            return f'[{self.__words(1, 2)}]({self.__url()})'
+        if construct == 'reference_link':
+            key = self.generator.randrange(100)
+            self.references.add(key)
+            return f'[{self.__words(1, 2)}][{key}]'
+        if construct == 'autolink':
+            return f'<{self.__url()}>'
+        if construct == 'email':
+            return f'<{self.generator.choice(WORDS)}@example.com>'
+        if construct == 'image':
+            return f'![{self.__words(1, 2)}](images/{self.__words(1, 1)}.png)'
+        if construct == 'emphasis':
+            return f'*{self.__words()}*'
+        if construct == 'strong':
+            return f'**{self.__words()}**'
+        if construct == 'strong_emphasis':
+            return f'***{self.__words()}***'
+        if construct == 'strikethrough':
+            return f'~~{self.__words()}~~'
+        return f'`{self.__words()}`'
+
+    def __text(self, minimum=2, maximum=6):
+        return ' '.join(
+            self.__inline()
+            for _ in range(self.generator.randint(minimum, maximum))
+        )
+
+    def __code(self):
+        """
+        Generate one line of code; it contains the characters MD and HTML
+        tags begin with, e.g. '_', '*', '<' and '&', which the code block
+        has to keep as they are;
+
+        RETURNS
+        -------
+        text : str
+        """
+
+        first, second, third = (
+            self.generator.choice(WORDS) for _ in range(3)
+        )
+        return self.generator.choice((
+            self.__words(2, 6).replace(' ', '(', 1) + ')',
+            f'{first}_{second}_{third} = {second}_{third} * 2 ** 3',
+            f'if {first} < {second} and {third} & 1:',
+            f'{first}(*{second}, **{third})',
+            f'return f"<{first}>{{{second}}}</{first}>"'
+        ))
+
+    def __block(self):
+        """
+        Generate one block of text, i.e. one chunk of the converter;
+
+        RETURNS
+        -------
+        lines : list
+        """
+
+        construct = self.__choose(self.block_weights)
+        lines = self.generator.randint(1, 5)
+        if construct == 'paragraph':
+            return [self.__text() for _ in range(lines)]
+        if construct == 'heading':
+            return ['#' * self.generator.randint(1, 6) + ' ' + self.__text()]
+        if construct == 'blockquote':
+            return ['> ' + self.__text() for _ in range(lines)]
+        if construct == 'unordered_list':
+            marker = self.generator.choice('-*+')
+            return [f'{marker} {self.__text(1, 3)}' for _ in range(lines)]
+        if construct == 'ordered_list':
+            return [
+                f'{number}. {self.__text(1, 3)}'
+                for number in range(1, lines + 1)
+            ]
+        return ['    ' + self.__code() for _ in range(lines)]
+
+    def generate(self, blocks):
+        """
+        Generate MD document, link references are defined at its end;
+
+        PARAMETERS
+        ----------
+        blocks : int
+            Contains number of blocks;
+
+        RETURNS
+        -------
+        text : str
+            Contains MD document;
+        """
+
+        text = ['\n'.join(self.__block()) for _ in range(blocks)]
+        definitions = [
+            f'[{key}]: {self.__url()}' for key in sorted(self.references)
+        ]
+        if definitions:
+            text.append('\n'.join(definitions))
+        return '\n\n'.join(text) + '\n'
+
+
+def parse_weights(values):
+    """
+    Parse 'CONSTRUCT=WEIGHT' command line arguments;
+
+    PARAMETERS
+    ----------
+    values : list
+        Contains the arguments;
+
+    RETURNS
+    -------
+    weights : dict
+    """
+
+    weights = dict()
+    for value in values or []:
+        construct, _, weight = value.partition('=')
+        weights[construct] = float(weight)
+    return weights
+
+
+def generate_corpus(blocks, seed=0, weights=None):
+    """
+    Generate reproducible MD document;
+
+    PARAMETERS
+    ----------
+    blocks : int
+        Contains number of blocks;
+    seed : int
+        Contains seed of the random generator;
+    weights : dict
+        Contains weights overriding the default weights of the constructs;
+
+    RETURNS
+    -------
+    text : str
+        Contains MD document;
+    """
+
+    return CorpusGenerator(seed, weights).generate(blocks)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate a synthetic MD corpus to the standard output.'
+    )
+    parser.add_argument('--blocks', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--weight', action='append', metavar='CONSTRUCT=WEIGHT',
+        help='weight of one of: ' + ', '.join(
+            list(BLOCK_WEIGHTS) + list(INLINE_WEIGHTS)
+        )
+    )
+    arguments = parser.parse_args()
+
+    sys.stdout.write(generate_corpus(
+        arguments.blocks, arguments.seed, parse_weights(arguments.weight)
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import DataController
+
+SAMPLE = '''# Release notes
+
+Some **important** changes were made, see [the docs](https://example.com/docs).
+Contact us at <support@example.com> or <https://example.com/support>.
+
+- first *item*
+- second `item`
+- third ~~item~~
+
+1. step one
+2. step two
+
+    def main():
+        return 0
+
+> Quoted text with a [reference][1].
+
+![Logo](images/logo.png)
+
+[1]: https://example.com/reference
+'''
+
+
+def convert_with_file_round_trip(text, directory):
+    """
+    Convert the text the way 'main.py' does, i.e. through './input.txt';
+
+    PARAMETERS
+    ----------
+    text : str
+        Contains MD text;
+    directory : str
+        Contains directory where the intermediate file is created;
+
+    RETURNS
+    -------
+    html : str
+        Contains HTML code;
+    """
+
+    file_name = os.path.join(directory, 'input.txt')
+    with open(file_name, 'w') as input_file:
+        input_file.write(text)
+    DataController.DataController(file_name).convert_md_to_html()
+    with open(file_name, 'r') as output_file:
+        return output_file.read()
+
+
+def measure(function, requests):
+    """
+    Measure latency of every single request;
+
+    PARAMETERS
+    ----------
+    function : callable
+        Contains function converting one document;
+    requests : int
+        Contains number of requests;
+
+    RETURNS
+    -------
+    latencies : list
+        Contains latency of every request in microseconds;
+    """
+
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        function()
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def report(name, latencies):
+    """
+    Print mean, median and 99th percentile of the latencies;
+
+    PARAMETERS
+    ----------
+    name : str
+        Contains name of the measured variant;
+    latencies : list
+        Contains latency of every request in microseconds;
+    """
+
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f'{name:<16} mean {statistics.mean(latencies):9.1f} us   '
+        f'p50 {statistics.median(latencies):9.1f} us   p99 {p99:9.1f} us'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Per-request latency with and without the file round-trip.'
+    )
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='how many times the sample document is repeated')
+    arguments = parser.parse_args()
+
+    text = SAMPLE * arguments.repeat
+    with tempfile.TemporaryDirectory() as directory:
+        expected = convert_with_file_round_trip(text, directory)
+        assert DataController.convert(text) == expected
+
+        report('file round-trip', measure(
+            lambda: convert_with_file_round_trip(text, directory),
+            arguments.requests
+        ))
+    report('in-memory', measure(
+        lambda: DataController.convert(text), arguments.requests
+    ))
+    report('in-memory bytes', measure(
+        lambda: DataController.convert(text.encode()), arguments.requests
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import InputController
+from benchmarks import corpus
+
+
+def read_line_by_line(text, file_name):
+    """
+    Read the text the way the interactive mode used to, i.e. 'input()'
+    and opening, appending and closing the file for every single line;
+
+    PARAMETERS
+    ----------
+    text : str
+        Contains MD text;
+    file_name : str
+        Contains path of the intermediate file;
+    """
+
+    with open(file_name, 'w'):
+        pass
+    lines = io.StringIO(text + 'Exit\n')
+    user_input = lines.readline().rstrip('\n')
+    while user_input.lower() != 'exit':
+        with open(file_name, 'a') as input_file:
+            input_file.write(user_input + '\n')
+        user_input = lines.readline().rstrip('\n')
+
+
+def read_interactively(text, file_name):
+    """
+    Read the text by the current interactive mode of 'InputController';
+
+    PARAMETERS
+    ----------
+    text : str
+        Contains MD text;
+    file_name : str
+        Contains path of the intermediate file;
+    """
+
+    standard_input = sys.stdin
+    sys.stdin = io.StringIO(text + 'Exit\n')
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            InputController.InputController(file_name).read_user_input()
+    finally:
+        sys.stdin = standard_input
+
+
+def read_piped(text, file_name):
+    """
+    Read the text by the pipe mode of 'InputController';
+
+    PARAMETERS
+    ----------
+    text : str
+        Contains MD text;
+    file_name : str
+        Contains path of the MD file;
+    """
+
+    InputController.InputController(
+        is_interactive=False
+    ).read_piped_input(file_name)
+
+
+def measure(function, *arguments):
+    start = time.perf_counter()
+    function(*arguments)
+    return time.perf_counter() - start
+
+
+def measure_command(command, text):
+    """
+    Measure the whole 'main.py' process with the text piped in;
+
+    PARAMETERS
+    ----------
+    command : list
+        Contains arguments of 'main.py';
+    text : str
+        Contains text piped into the standard input;
+
+    RETURNS
+    -------
+    duration : float
+        Contains duration in seconds;
+    """
+
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, 'main.py'] + command, input=text.encode(),
+        stdout=subprocess.DEVNULL, check=True
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Reading of large piped inputs, interactive vs pipe mode.'
+    )
+    parser.add_argument('--blocks', type=int, nargs='+',
+                        default=[1000, 10000, 100000])
+    parser.add_argument('--end-to-end', action='store_true',
+                        help='measure the whole main.py process as well')
+    arguments = parser.parse_args()
+
+    print(f'{"lines":>9} {"MB":>7} {"per-line append":>16} '
+          f'{"interactive":>12} {"pipe":>9}')
+    with tempfile.TemporaryDirectory() as directory:
+        file_name = os.path.join(directory, 'input.txt')
+        for blocks in arguments.blocks:
+            text = corpus.generate_corpus(blocks)
+            with open(os.path.join(directory, 'piped.md'), 'w') as piped:
+                piped.write(text)
+            timings = [
+                measure(read_line_by_line, text, file_name),
+                measure(read_interactively, text, file_name),
+                measure(read_piped, text, piped.name)
+            ]
+            print(
+                f'{text.count(chr(10)):>9} {len(text) / 2 ** 20:>7.1f} '
+                + ' '.join(
+                    f'{timing * 1000:>{width}.1f}ms'
+                    for timing, width in zip(timings, (14, 10, 7))
+                )
+            )
+            if arguments.end_to_end:
+                interactive = measure_command([], text + 'Exit\n')
+                piped_total = measure_command(['--pipe'], text)
+                print(f'{"":>9} main.py: interactive {interactive:.2f}s, '
+                      f'--pipe {piped_total:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import random
+import time
+
+import DataController
+
+
+def generate_document(references, lines, seed=0):
+    """
+    Generate MD document similar to the generated API docs, i.e. lines
+    using reference-style links followed by all of the definitions;
+
+    PARAMETERS
+    ----------
+    references : int
+        Contains number of defined references;
+    lines : int
+        Contains number of lines using the references;
+    seed : int
+        Contains seed of the random generator;
+
+    RETURNS
+    -------
+    text : str
+        Contains MD document;
+    """
+
+    generator = random.Random(seed)
+    body = []
+    for index in range(lines):
+        key = generator.randrange(references)
+        body.append(
+            f'Method number {index} is described in [the docs][{key}] '
+            f'and [{generator.randrange(references)}].'
+        )
+        if index % 5 == 4:
+            body.append('')
+    definitions = [
+        f'[{key}]: https://example.com/api/{key}.html'
+        for key in range(references)
+    ]
+    return '\n'.join(body) + '\n\n' + '\n'.join(definitions) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Conversion time as the number of references grows.'
+    )
+    parser.add_argument('--lines', type=int, default=2000)
+    parser.add_argument('--references', type=int, nargs='+',
+                        default=[10, 100, 1000, 10000, 100000])
+    arguments = parser.parse_args()
+
+    print(f'{"references":>10} {"total ms":>10} {"us / line":>10}')
+    for references in arguments.references:
+        text = generate_document(references, arguments.lines)
+        start = time.perf_counter()
+        DataController.convert(text)
+        elapsed = time.perf_counter() - start
+        print(
+            f'{references:>10} {elapsed * 1e3:>10.1f} '
+            f'{elapsed * 1e6 / (arguments.lines + references):>10.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
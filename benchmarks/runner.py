@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+import DataController
+import StageProfiler
+from benchmarks import corpus
+
+
+def run_pipeline(text):
+    """
+    Convert the text stage by stage, the same way 'convert_md_to_html()'
+    does, and measure every private stage on its own;
+    The chunks are processed by '__process_chunk()' itself with
+    a 'StageProfiler', so every chunk takes the path of the conversion,
+    e.g. a code block or a plain paragraph skips the stages it does not
+    need; the durations of every stage are summed over all of the chunks;
+
+    PARAMETERS
+    ----------
+    text : str
+        Contains MD text;
+
+    RETURNS
+    -------
+    timings : dict
+        Contains duration of every stage in seconds;
+    html : str
+        Contains HTML code;
+    """
+
+    timings = dict()
+    controller = DataController.DataController(None)
+    context = DataController.ConversionContext()
+
+    def call(name, *arguments):
+        function = getattr(controller, '_DataController__' + name)
+        start = time.perf_counter()
+        result = function(*arguments)
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+        return result
+
+    context.lines = text
+    call('remove_blank_line_duplicates', context)
+    call('convert_to_array', context)
+    call('process_link_references', context)
+    start = time.perf_counter()
+    chunks = list(controller._DataController__split_into_chunks(
+        controller._DataController__pop_source_lines(context)
+    ))
+    timings['split_into_chunks'] = time.perf_counter() - start
+
+    context.profiler = StageProfiler.StageProfiler()
+    chunks = [
+        controller._DataController__process_chunk(context, chunk)
+        for chunk in chunks
+    ]
+    for (stage, _), stats in context.profiler.stats.items():
+        timings[stage] = timings.get(stage, 0.0) + stats.seconds
+
+    html = ''.join(line + '\n' for chunk in chunks for line in chunk)
+    return timings, html
+
+
+def measure_file_conversion(text, directory):
+    """
+    Measure the whole 'convert_md_to_html()' path, including reading
+    and writing of the file;
+
+    PARAMETERS
+    ----------
+    text : str
+        Contains MD text;
+    directory : str
+        Contains directory where the file is created;
+
+    RETURNS
+    -------
+    duration : float
+        Contains duration in seconds;
+    html : str
+        Contains HTML code;
+    """
+
+    file_name = os.path.join(directory, 'input.txt')
+    with open(file_name, 'w') as input_file:
+        input_file.write(text)
+    start = time.perf_counter()
+    DataController.DataController(file_name).convert_md_to_html()
+    duration = time.perf_counter() - start
+    with open(file_name, 'r') as output_file:
+        return duration, output_file.read()
+
+
+def find_commit():
+    """
+    Find the current commit, so that the results can be compared;
+
+    RETURNS
+    -------
+    commit : str or None
+    """
+
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(text, repeat):
+    """
+    Run the whole path and all of the stages several times and keep
+    the fastest run of each of them;
+
+    PARAMETERS
+    ----------
+    text : str
+        Contains MD text;
+    repeat : int
+        Contains number of runs;
+
+    RETURNS
+    -------
+    results : dict
+        Contains seconds, lines per second and MB per second of every stage;
+    """
+
+    lines = text.count('\n') + 1
+    megabytes = len(text.encode()) / 2 ** 20
+    best = dict()
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(repeat):
+            duration, expected = measure_file_conversion(text, directory)
+            timings, html = run_pipeline(text)
+            assert html == expected, 'stages do not match convert_md_to_html'
+            timings = {'convert_md_to_html': duration, **timings}
+            for name, seconds in timings.items():
+                best[name] = min(best.get(name, seconds), seconds)
+
+    return {
+        name: {
+            'seconds': seconds,
+            'lines_per_second': lines / seconds if seconds else None,
+            'megabytes_per_second': megabytes / seconds if seconds else None
+        }
+        for name, seconds in best.items()
+    }
+
+
+def report(results, baseline=None):
+    """
+    Print the results, optionally compared to the results of another run;
+
+    PARAMETERS
+    ----------
+    results : dict
+        Contains results of 'run_benchmark()';
+    baseline : dict
+        Contains results of another run loaded from the JSON file;
+    """
+
+    header = f'{"stage":<30} {"ms":>10} {"lines/s":>12} {"MB/s":>8}'
+    print(header + ('   speedup' if baseline else ''))
+    for name, result in results.items():
+        line = (
+            f'{name:<30} {result["seconds"] * 1000:10.2f} '
+            f'{result["lines_per_second"] or 0:12.0f} '
+            f'{result["megabytes_per_second"] or 0:8.2f}'
+        )
+        if baseline and name in baseline:
+            line += f'   {baseline[name]["seconds"] / result["seconds"]:7.2f}x'
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Throughput of the conversion and of its private stages.'
+    )
+    parser.add_argument('--blocks', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--weight', action='append', metavar='CONSTRUCT=WEIGHT',
+        help='weight of a construct of the corpus, see benchmarks.corpus'
+    )
+    parser.add_argument('--output', help='save the results into JSON file')
+    parser.add_argument('--compare', help='compare with saved JSON results')
+    arguments = parser.parse_args()
+
+    weights = corpus.parse_weights(arguments.weight)
+    text = corpus.generate_corpus(arguments.blocks, arguments.seed, weights)
+    results = run_benchmark(text, arguments.repeat)
+
+    baseline = None
+    if arguments.compare:
+        with open(arguments.compare, 'r') as baseline_file:
+            saved = json.load(baseline_file)
+        if (saved['corpus']['blocks'], saved['corpus']['seed'],
+                saved['corpus']['weights']) != (
+                arguments.blocks, arguments.seed, weights):
+            print('Warning: the saved results were measured on another corpus')
+        baseline = saved['results']
+    report(results, baseline)
+
+    if arguments.output:
+        with open(arguments.output, 'w') as output_file:
+            json.dump({
+                'commit': find_commit(),
+                'python': platform.python_version(),
+                'corpus': {
+                    'blocks': arguments.blocks,
+                    'seed': arguments.seed,
+                    'weights': weights,
+                    'lines': text.count('\n') + 1,
+                    'bytes': len(text.encode())
+                },
+                'repeat': arguments.repeat,
+                'results': results
+            }, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+import argparse
+import gc
+import math
+import sys
+import time
+
+import DataController
+import StageProfiler
+
+INLINE_PIECES = (
+    'word', '*emphasis*', '**strong**', '`code`', '~~deleted~~',
+    '_underscore_', '[inline](https://example.com/a.html)', '[text][key]',
+    '<https://example.com/b.html>', '![image](https://example.com/c.png)'
+)
+BLOCKS = (
+    'Some *text* of the paragraph with a [link][key].',
+    '## Heading with `code`',
+    '> Quoted **text**',
+    '* item with ~~deleted~~ text\n* another item',
+    '1. first\n2. second',
+    '    indented code [not a link]'
+)
+DEFINITION = '\n\n[key]: https://example.com/key.html\n'
+
+# Every family generates a document from its size, the document grows
+# linearly with the size; the bound is the highest allowed exponent.
+FAMILIES = {
+    'line_length': (
+        lambda size: ' '.join(
+            INLINE_PIECES[index % len(INLINE_PIECES)]
+            for index in range(size)
+        ) + DEFINITION,
+        1.0, 1000
+    ),
+    'lines_per_chunk': (
+        lambda size: '\n'.join(
+            f'Line {index} with *text* and a [link][key].'
+            for index in range(size)
+        ) + DEFINITION,
+        1.0, 1000
+    ),
+    'list_items': (
+        lambda size: '\n'.join(
+            f'* item {index} with **text**' for index in range(size)
+        ),
+        1.0, 1000
+    ),
+    'chunk_count': (
+        lambda size: '\n\n'.join(
+            BLOCKS[index % len(BLOCKS)] for index in range(size)
+        ) + DEFINITION,
+        1.0, 300
+    ),
+    'reference_count': (
+        lambda size: '\n'.join(
+            f'See [text {index}][key{index}] here.' for index in range(size)
+        ) + '\n\n' + '\n'.join(
+            f'[key{index}]: https://example.com/{index}.html'
+            for index in range(size)
+        ),
+        1.0, 500
+    ),
+    'delimiter_count': (
+        lambda size: '*a **b _c ~~d `e ' * size + 'f* g_ h~~' * size,
+        1.0, 500
+    ),
+    'bracket_count': (
+        lambda size: '[a ' * size + '![b](' * size + '](https://x.com/)',
+        1.0, 500
+    )
+}
+
+
+def fit_exponent(sizes, seconds, min_time=0.0):
+    """
+    Fit the exponent of the time growth from the ratios of the times of
+    the consecutive sizes, so that the speed of the machine does not matter;
+    The median of the exponents of all of the steps is taken, so that one
+    step, e.g. when the data outgrow a cache of the CPU, does not fail
+    the check, while a superlinear stage grows too fast in every step;
+    Steps starting below 'min_time' are too noisy and are left out,
+    at least two steps have to remain;
+
+    PARAMETERS
+    ----------
+    sizes : list
+        Contains sizes of the documents;
+    seconds : list
+        Contains time of every size;
+    min_time : float
+        Contains the shortest time in seconds a step may start with;
+
+    RETURNS
+    -------
+    exponent : float or None
+        Contains 1.0 for linear, 2.0 for quadratic growth etc., None if
+        the times are too short;
+    """
+
+    exponents = sorted(
+        math.log(seconds[index + 1] / seconds[index])
+        / math.log(sizes[index + 1] / sizes[index])
+        for index in range(len(sizes) - 1)
+        if seconds[index] >= max(min_time, 1e-9)
+    )
+    if len(exponents) < 2:
+        return None
+    middle = len(exponents) // 2
+    if len(exponents) % 2:
+        return exponents[middle]
+    return (exponents[middle - 1] + exponents[middle]) / 2
+
+
+def measure_family(generate, sizes, repeat):
+    """
+    Measure the conversion of every size of the family, once as a whole and
+    once stage by stage using 'StageProfiler';
+    The sizes are measured in rounds, every round converts every size once,
+    so that a slow period of the machine affects all of the sizes alike;
+    The first round only warms up the converter and the caches;
+    The best time of every size and every stage is kept;
+
+    PARAMETERS
+    ----------
+    generate : function
+        Contains function generating the document of the given size;
+    sizes : list
+        Contains sizes of the documents;
+    repeat : int
+        Contains number of rounds;
+
+    RETURNS
+    -------
+    totals : list
+        Contains the best time of the whole conversion of every size;
+    stages : dict
+        Contains the best time of every size by the stage;
+    """
+
+    texts = [generate(size) for size in sizes]
+    for text in texts:
+        DataController.convert(text)
+    totals = [float('inf')] * len(sizes)
+    stages = dict()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for index, text in enumerate(texts):
+                start = time.perf_counter()
+                DataController.convert(text)
+                totals[index] = min(
+                    totals[index], time.perf_counter() - start
+                )
+
+                profiler = StageProfiler.StageProfiler()
+                DataController.convert(text, profiler=profiler)
+                seconds = dict()
+                for (stage, _), stats in profiler.stats.items():
+                    seconds[stage] = seconds.get(stage, 0.0) + stats.seconds
+                for stage, value in seconds.items():
+                    best = stages.setdefault(
+                        stage, [float('inf')] * len(sizes)
+                    )
+                    best[index] = min(best[index], value)
+            gc.collect()
+    finally:
+        gc.enable()
+    return totals, stages
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Convert every construct family at growing sizes, fit '
+                    'the exponent of the time growth of the conversion and '
+                    'of every stage, and fail if it exceeds the bound.'
+    )
+    parser.add_argument('--steps', type=int, default=5,
+                        help='number of sizes, each one twice the previous, '
+                             'at least 3')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiplier of the smallest size of every family')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='allowed excess of the exponent over the bound')
+    parser.add_argument('--min-time', type=float, default=0.5,
+                        help='times shorter than this, in ms, are too noisy '
+                             'to be fitted')
+    parser.add_argument('--family', nargs='+', choices=FAMILIES,
+                        default=list(FAMILIES))
+    arguments = parser.parse_args()
+    if arguments.steps < 3:
+        parser.error('--steps has to be at least 3, at least two ratios of '
+                     'the times are fitted')
+
+    print(f'{"family":<18} {"sizes":>14} {"total":>7}   worst stage')
+    failures = []
+    for family in arguments.family:
+        generate, bound, smallest = FAMILIES[family]
+        smallest = max(1, int(smallest * arguments.scale))
+        sizes = [smallest * 2 ** step for step in range(arguments.steps)]
+        totals, stages = measure_family(generate, sizes, arguments.repeat)
+
+        exponents = dict()
+        total = fit_exponent(sizes, totals)
+        if total is not None:
+            exponents['total'] = total
+        for stage, seconds in stages.items():
+            exponent = fit_exponent(sizes, seconds, arguments.min_time / 1e3)
+            if exponent is not None:
+                exponents[stage] = exponent
+        worst = max(
+            (stage for stage in exponents if stage != 'total'),
+            key=exponents.get, default=None
+        )
+        print(
+            f'{family:<18} {sizes[0]:>6}..{sizes[-1]:<6} '
+            + ('too short' if total is None else f'{total:>7.2f}') + '   '
+            + ('-' if worst is None else f'{worst} {exponents[worst]:.2f}')
+        )
+        stages['total'] = totals
+        for stage, exponent in exponents.items():
+            if exponent > bound + arguments.tolerance:
+                failures.append(
+                    (family, stage, exponent, bound, stages[stage])
+                )
+
+    for family, stage, exponent, bound, seconds in failures:
+        print(
+            f'FAIL: {family}: {stage} grows with exponent {exponent:.2f}, '
+            f'the bound is {bound:.2f}, times in ms: '
+            + ' '.join(f'{value * 1e3:.2f}' for value in seconds),
+            file=sys.stderr
+        )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
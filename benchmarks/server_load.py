@@ -0,0 +1,173 @@
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import DataController
+import ServerController
+from benchmarks import corpus
+
+
+async def connect(arguments):
+    """
+    Open one connection to the server;
+
+    PARAMETERS
+    ----------
+    arguments : argparse.Namespace
+        Contains address of the server;
+
+    RETURNS
+    -------
+    reader, writer : asyncio.StreamReader, asyncio.StreamWriter
+    """
+
+    if arguments.socket is not None:
+        return await asyncio.open_unix_connection(arguments.socket)
+    return await asyncio.open_connection(arguments.host, arguments.port)
+
+
+async def wait_for_server(arguments, timeout=10.0):
+    """
+    Wait until the spawned server accepts connections;
+
+    PARAMETERS
+    ----------
+    arguments : argparse.Namespace
+        Contains address of the server;
+    timeout : float
+        Contains number of seconds to wait;
+    """
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await connect(arguments)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+        else:
+            writer.close()
+            return
+
+
+async def run_client(arguments, documents, requests, latencies):
+    """
+    Send the requests one after another over a single connection;
+
+    PARAMETERS
+    ----------
+    arguments : argparse.Namespace
+        Contains address of the server;
+    documents : list
+        Contains pairs of MD text and expected HTML code;
+    requests : iterator
+        Contains indexes of the documents shared by all of the clients;
+    latencies : list
+        Collects latency of every request in microseconds;
+    """
+
+    reader, writer = await connect(arguments)
+    try:
+        for index in requests:
+            text, expected = documents[index % len(documents)]
+            start = time.perf_counter()
+            html = await ServerController.request_conversion(
+                reader, writer, text
+            )
+            latencies.append((time.perf_counter() - start) * 1e6)
+            assert html == expected, 'the server returned wrong HTML code'
+    finally:
+        writer.close()
+
+
+async def run_load_test(arguments, documents):
+    """
+    Run the clients concurrently and collect the latencies;
+
+    PARAMETERS
+    ----------
+    arguments : argparse.Namespace
+        Contains address of the server and the parameters of the test;
+    documents : list
+        Contains pairs of MD text and expected HTML code;
+
+    RETURNS
+    -------
+    latencies : list
+        Contains latency of every request in microseconds;
+    elapsed : float
+        Contains duration of the whole test in seconds;
+    """
+
+    await wait_for_server(arguments)
+    latencies = []
+    requests = iter(range(arguments.requests))
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_client(arguments, documents, requests, latencies)
+        for _ in range(arguments.concurrency)
+    ))
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Latency of the conversion server under a concurrent load.'
+    )
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--blocks', type=int, default=20,
+                        help='number of blocks of a small document')
+    parser.add_argument('--large-blocks', type=int, default=0,
+                        help='number of blocks of a large document, '
+                             'every tenth request is large if not 0')
+    parser.add_argument('--socket', help='Unix socket of a running server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int,
+                        help='TCP port of a running server')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='worker processes of the spawned server')
+    arguments = parser.parse_args()
+
+    texts = [
+        corpus.generate_corpus(arguments.blocks, seed)
+        for seed in range(9 if arguments.large_blocks else 10)
+    ]
+    if arguments.large_blocks:
+        texts.append(corpus.generate_corpus(arguments.large_blocks, 9))
+    documents = [(text, DataController.convert(text)) for text in texts]
+
+    server = None
+    with tempfile.TemporaryDirectory() as directory:
+        if arguments.socket is None and arguments.port is None:
+            arguments.socket = os.path.join(directory, 'server.sock')
+            server = subprocess.Popen([
+                sys.executable, 'main.py', '--serve',
+                '--socket', arguments.socket, '--jobs', str(arguments.jobs)
+            ])
+        try:
+            latencies, elapsed = asyncio.run(
+                run_load_test(arguments, documents)
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f'{len(latencies)} requests, concurrency {arguments.concurrency}: '
+        f'{len(latencies) / elapsed:.0f} requests/s   '
+        f'p50 {statistics.median(latencies):.0f} us   p99 {p99:.0f} us'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+import argparse
+import random
+import sys
+import time
+
+import DataController
+import SessionController
+from benchmarks import corpus
+
+PIECES = (
+    '', ' ', '   ', '\t', '\n', '\n\n', '\n  \n', 'x', '_y_', '*', '**b**',
+    '`c`', '# ', '> ', '1. ', '- item', '    code', '[k1]', 'see [k1] and '
+    '[t][k2]', '[k1]: http://www.a.com/x', '[k2]: <https://b.org>',
+    '\n[k1]: http://www.c.net\n', '\n[k2]: http://e.com\n',
+    '\n[k3]: http://d.io\n'
+)
+
+PROSE_CASES = (
+    'Note: the mirror [1]: https://www.x.com is down today.\n\nok',
+    'Intro\nThe RFC [RFC 7231]: https://www.rfc.org explains it\nTail',
+    '- see [k1]: http://www.a.com/x\n- and [t][k1]'
+)
+
+
+def choose_position(generator, lines):
+    """
+    Choose a random position in the text;
+
+    PARAMETERS
+    ----------
+    generator : random.Random
+        Contains the generator of the edits;
+    lines : list
+        Contains lines of the text;
+
+    RETURNS
+    -------
+    position : tuple
+        Contains number of the line and number of the column;
+    """
+
+    line_number = generator.randrange(len(lines))
+    return line_number, generator.randint(0, len(lines[line_number]))
+
+
+def check_session(seed, blocks, edits):
+    """
+    Apply random edits to the session and compare its HTML code with
+    the conversion of the whole edited text after every edit;
+    The edits insert, replace and remove text, blank lines and the
+    definitions of link references, so that both the re-split blocks
+    and the blocks depending on a changed definition are checked;
+
+    PARAMETERS
+    ----------
+    seed : int
+        Contains seed of the document and of the edits;
+    blocks : int
+        Contains number of blocks of the document;
+    edits : int
+        Contains number of edits;
+
+    RETURNS
+    -------
+    mismatch : tuple or None
+        Contains number of the edit and the edited text, None if HTML code
+        always matched;
+    """
+
+    generator = random.Random(seed)
+    text = ''
+    if seed % 3:
+        text = corpus.generate_corpus(generator.randint(0, blocks), seed)
+    session = SessionController.SessionController(text)
+    for edit in range(edits):
+        start, end = sorted((
+            choose_position(generator, session.lines),
+            choose_position(generator, session.lines)
+        ))
+        if generator.random() < 0.5:
+            end = start
+        session.edit(start, end, ''.join(
+            generator.choice(PIECES)
+            for _ in range(generator.randint(0, 3))
+        ))
+        text = '\n'.join(session.lines)
+        if session.render() != DataController.convert(text):
+            return edit, text
+    return None
+
+
+def check_prose(text):
+    """
+    Check that no line of the prose is taken for the definition of a link
+    reference only because it mentions one, i.e. that every line of
+    the text is kept both by the conversion and by the session;
+
+    PARAMETERS
+    ----------
+    text : str
+        Contains MD text, none of whose lines starts with a key;
+
+    RETURNS
+    -------
+    value : bool
+        Contains whether HTML code kept all of the lines;
+    """
+
+    html = DataController.convert(text)
+    words = [line.split()[-1] for line in text.split('\n') if line.strip()]
+    return (
+        SessionController.SessionController(text).render() == html
+        and all(word in html for word in words)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Edit sessions at random and compare their HTML code '
+                    'with the conversion of the whole text.'
+    )
+    parser.add_argument('--sessions', type=int, default=300)
+    parser.add_argument('--blocks', type=int, default=20)
+    parser.add_argument('--edits', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args()
+
+    failures = 0
+    for text in PROSE_CASES:
+        if not check_prose(text):
+            failures += 1
+            print(f'prose lost: {text!r}')
+    start = time.perf_counter()
+    for seed in range(arguments.seed, arguments.seed + arguments.sessions):
+        mismatch = check_session(seed, arguments.blocks, arguments.edits)
+        if mismatch is not None:
+            failures += 1
+            edit, text = mismatch
+            print(f'session {seed}, edit {edit}: {text[:200]!r}')
+    print(
+        f'{arguments.sessions} sessions of {arguments.edits} edits '
+        f'{(time.perf_counter() - start) * 1e3:.1f} ms   '
+        f'{failures} mismatches'
+    )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
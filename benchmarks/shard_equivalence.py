@@ -0,0 +1,126 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import DataController
+import ShardController
+
+PIECES = (
+    ' ', '  ', '    ', '\t', '\v', '\xa0', '\r', '\r\n', 'a', 'bc', 'é☃',
+    '*', '_', '`', '~~', '<', '&', '!', '#', '# ', '> ', '- ', '1. ', '\n',
+    '\n', '\n\n', '\n \n\t\n', '(http://a.bc)', '[k]', '[j]',
+    '[k]: http://x.com', '[k]: http://y.com', '[j]: http://j.com'
+)
+
+
+def generate_document(seed, length):
+    """
+    Generate a random MD document; it contains blank lines of all kinds,
+    code and the definitions of link references used both before and
+    after them, so that the shards are cut at all kinds of chunks;
+
+    PARAMETERS
+    ----------
+    seed : int
+        Contains seed of the document;
+    length : int
+        Contains maximal number of pieces of the document;
+
+    RETURNS
+    -------
+    text : str
+        Contains MD document;
+    """
+
+    generator = random.Random(seed)
+    return ''.join(
+        generator.choice(PIECES)
+        for _ in range(generator.randint(1, length))
+    )
+
+
+def check_document(directory, text, shard_sizes, jobs):
+    """
+    Split the document into shards of every given size, convert and merge
+    them, and compare the merged HTML code with the conversion of the whole
+    document;
+
+    PARAMETERS
+    ----------
+    directory : str
+        Contains directory of the document, the shards and the HTML code;
+    text : str
+        Contains MD document;
+    shard_sizes : list
+        Contains minimal numbers of characters of one shard;
+    jobs : int
+        Contains number of worker processes converting the shards;
+
+    RETURNS
+    -------
+    shard_size : int or None
+        Contains the shard size whose HTML code did not match, None if all
+        of them matched;
+    """
+
+    source_file_name = os.path.join(directory, 'doc.md')
+    target_file_name = os.path.join(directory, 'doc.html')
+    with open(
+        source_file_name, 'w', encoding='utf-8', newline=''
+    ) as source_file:
+        source_file.write(text)
+    expected = DataController.convert(text.encode()).decode()
+    shard_controller = ShardController.ShardController(
+        os.path.join(directory, 'shards')
+    )
+    for shard_size in shard_sizes:
+        shard_controller.split(source_file_name, shard_size)
+        shard_controller.convert_shards(jobs=jobs)
+        shard_controller.merge(target_file_name)
+        with open(target_file_name, 'r', encoding='utf-8') as target_file:
+            if target_file.read() != expected:
+                return shard_size
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Split random documents into shards, convert and merge '
+                    'them and compare the result with the whole conversion.'
+    )
+    parser.add_argument('--documents', type=int, default=300)
+    parser.add_argument('--length', type=int, default=300)
+    parser.add_argument(
+        '--shard-size', type=int, nargs='+', default=[1, 7, 50, 10 ** 9]
+    )
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args()
+
+    failures = 0
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory:
+        for seed in range(
+            arguments.seed, arguments.seed + arguments.documents
+        ):
+            text = generate_document(seed, arguments.length)
+            shard_size = check_document(
+                directory, text, arguments.shard_size, arguments.jobs
+            )
+            if shard_size is not None:
+                failures += 1
+                print(f'document {seed}, shard size {shard_size}: '
+                      f'{text[:200]!r}')
+    print(
+        f'{arguments.documents} documents '
+        f'{(time.perf_counter() - start) * 1e3:.1f} ms   '
+        f'{failures} mismatches'
+    )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import argparse
+import sys
+import time
+
+import DataController
+
+BLOCKS = (
+    ('Paragraph {number} starts here', 'and ends *here*.   '),
+    ('- item of list {number}', '- another item  '),
+    ('> quote {number}',),
+    ('# Heading {number}',),
+    ('    code {number} = a_b * 2 < 3', '    return code  ')
+)
+
+
+def generate_blocks(count):
+    """
+    Generate blocks of all kinds, every one of them contains its number,
+    so that its HTML code can be recognized;
+
+    PARAMETERS
+    ----------
+    count : int
+        Contains number of blocks;
+
+    RETURNS
+    -------
+    blocks : list
+        Contains lines of every block;
+    """
+
+    return [
+        [line.format(number=f'block{number}') for line in
+         BLOCKS[number % len(BLOCKS)]]
+        for number in range(count)
+    ]
+
+
+def read_slowly(lines, delay, reads):
+    """
+    Yield the lines like a slow producer, e.g. a pipe of a program
+    writing its output line by line;
+
+    PARAMETERS
+    ----------
+    lines : list
+        Contains lines of the document;
+    delay : float
+        Contains seconds between two lines;
+    reads : list
+        Collects the time at which every line was read;
+
+    YIELDS
+    ------
+    line : str
+        Contains line with its line ending;
+    """
+
+    for line in lines:
+        time.sleep(delay)
+        reads.append(time.perf_counter())
+        yield line + '\n'
+
+
+def measure_latency(blocks, delay, hold_size):
+    """
+    Stream the blocks from the slow producer and find out when HTML code
+    of every block was yielded;
+
+    PARAMETERS
+    ----------
+    blocks : list
+        Contains lines of every block;
+    delay : float
+        Contains seconds between two lines;
+    hold_size : int
+        Contains 'hold_size' of 'stream_md_to_html()';
+
+    RETURNS
+    -------
+    late : int
+        Contains number of blocks yielded only after a line of the next
+        block was read;
+    latencies : list
+        Contains seconds from the blank line closing the block until its
+        HTML code was yielded;
+    """
+
+    lines = []
+    closing_lines = []
+    for block in blocks:
+        lines.extend(block)
+        closing_lines.append(len(lines))
+        lines.append('')
+
+    reads = []
+    yielded = dict()
+    data_controller = DataController.DataController(None)
+    for html in data_controller.stream_md_to_html(
+        read_slowly(lines, delay, reads), hold_size
+    ):
+        moment = time.perf_counter()
+        for number in range(len(blocks)):
+            if f'block{number}' in html:
+                yielded.setdefault(number, (len(reads), moment))
+
+    late = 0
+    latencies = []
+    for number, closing_line in enumerate(closing_lines):
+        lines_read, moment = yielded[number]
+        if lines_read > closing_line + 1:
+            late += 1
+        latencies.append(moment - reads[closing_line])
+    return late, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Stream blocks from a slow producer and check that every '
+                    'block is converted as soon as its blank line is read.'
+    )
+    parser.add_argument('--blocks', type=int, default=50)
+    parser.add_argument('--delay', type=float, default=0.005)
+    arguments = parser.parse_args()
+
+    blocks = generate_blocks(arguments.blocks)
+    failures = 0
+    for name, hold_size in (('stream_md_to_html()', 0),
+                            ('stream_md_to_html(hold_size)', 2 ** 20)):
+        late, latencies = measure_latency(blocks, arguments.delay, hold_size)
+        failures += late
+        print(
+            f'{name:<30} {len(blocks):>6} blocks '
+            f'{sum(latencies) / len(latencies) * 1e3:>8.2f} ms mean '
+            f'{max(latencies) * 1e3:>8.2f} ms max   {late} late'
+        )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import concurrent.futures
+import io
+import sys
+import time
+
+import DataController
+from benchmarks import corpus
+
+
+def generate_documents(count, blocks):
+    """
+    Generate documents, every one of them defines the same keys of link
+    references with its own links, so that a reference leaking from one
+    document into another changes HTML code;
+
+    PARAMETERS
+    ----------
+    count : int
+        Contains number of documents;
+    blocks : int
+        Contains number of blocks of every document;
+
+    RETURNS
+    -------
+    documents : list
+        Contains MD documents;
+    """
+
+    return [
+        corpus.generate_corpus(blocks, seed)
+        + f'\n\nSee [the docs][shared] of document {seed}.\n\n'
+        + f'[shared]: https://example.com/document/{seed}.html\n'
+        for seed in range(count)
+    ]
+
+
+def convert_concurrently(function, documents, threads, rounds):
+    """
+    Convert every document 'rounds' times from the pool of threads;
+
+    PARAMETERS
+    ----------
+    function : function
+        Contains function converting one document;
+    documents : list
+        Contains MD documents;
+    threads : int
+        Contains number of threads;
+    rounds : int
+        Contains number of conversions of every document;
+
+    RETURNS
+    -------
+    results : list
+        Contains pairs of the index of the document and its HTML code;
+    elapsed : float
+        Contains duration of all of the conversions in seconds;
+    """
+
+    indexes = [
+        index for _ in range(rounds) for index in range(len(documents))
+    ]
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(threads) as executor:
+        htmls = list(executor.map(
+            lambda index: function(documents[index]), indexes
+        ))
+    return list(zip(indexes, htmls)), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Convert documents from many threads sharing one warm '
+                    'converter and compare the results with serial output.'
+    )
+    parser.add_argument('--documents', type=int, default=32)
+    parser.add_argument('--blocks', type=int, default=40)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=4)
+    arguments = parser.parse_args()
+
+    documents = generate_documents(arguments.documents, arguments.blocks)
+    expected = [
+        DataController.DataController(None, document).render_md_to_html()
+        for document in documents
+    ]
+
+    data_controller = DataController.DataController(None)
+    functions = {
+        'shared convert_text()': data_controller.convert_text,
+        'shared convert_text() with budget': lambda document: (
+            data_controller.convert_text(document, work_budget=10 ** 9)
+        ),
+        'shared stream_md_to_html()': lambda document: ''.join(
+            data_controller.stream_md_to_html(io.StringIO(document))
+        ),
+        'DataController.convert()': DataController.convert
+    }
+
+    # Switch the threads as often as possible to provoke interleaving.
+    sys.setswitchinterval(1e-6)
+    failures = 0
+    for name, function in functions.items():
+        results, elapsed = convert_concurrently(
+            function, documents, arguments.threads, arguments.rounds
+        )
+        reference = expected
+        if 'stream' in name:
+            reference = [
+                ''.join(DataController.DataController(None).stream_md_to_html(
+                    io.StringIO(document)
+                ))
+                for document in documents
+            ]
+        mismatches = sum(
+            html != reference[index] for index, html in results
+        )
+        failures += mismatches
+        print(
+            f'{name:<36} {len(results):>6} conversions '
+            f'{elapsed * 1e3:>9.1f} ms   {mismatches} mismatches'
+        )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
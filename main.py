@@ -1,12 +1,264 @@
+import argparse
+import os
+import sys
+
+import BatchController
+import CompressionController
+import IndexController
 import InputController
 import DataController
+import InlineScanner
 import OutputController
+import ServerController
+import ShardController
+import StageProfiler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Convert text in MarkDown format to HTML.'
+    )
+    parser.add_argument(
+        'file', nargs='?',
+        help='convert the MD file and print HTML code, implies --pipe'
+    )
+    parser.add_argument(
+        '--pipe', action='store_true',
+        help='read the standard input until EOF and print HTML code'
+    )
+    parser.add_argument(
+        '--output', metavar='FILE',
+        help='write HTML code of the piped input into the file, not stdout'
+    )
+    parser.add_argument(
+        '--stream', nargs='?', type=int, const=2 ** 20, metavar='HOLD_SIZE',
+        help='convert the piped input while it is read, chunks using link '
+             'references defined later are held back up to HOLD_SIZE '
+             'characters, implies --pipe'
+    )
+    parser.add_argument(
+        '--jobs', type=int, default=1,
+        help='number of worker processes converting the chunks in parallel'
+    )
+    parser.add_argument(
+        '--mmap', action='store_true',
+        help='map the input file into the memory instead of reading it, '
+             'only the current block is decoded'
+    )
+    parser.add_argument(
+        '--profile', nargs='?', const='table', choices=('table', 'json'),
+        help='print statistics of every stage of the conversion to stderr'
+    )
+    parser.add_argument(
+        '--work-budget', type=int, metavar='STEPS',
+        help='fail once the conversion of one document takes more steps'
+    )
+    parser.add_argument(
+        '--compress', nargs='+', default=(), metavar='FORMAT',
+        choices=CompressionController.available_formats(),
+        help='write compressed copies of the HTML file, e.g. FILE.gz, '
+             'in any of the formats: '
+             + ', '.join(CompressionController.available_formats())
+    )
+    parser.add_argument(
+        '--index', action='store_true',
+        help='write byte offsets of the blocks and the sections of the HTML '
+             'file into FILE.index.json'
+    )
+    parser.add_argument(
+        '--batch', metavar='DIRECTORY',
+        help='convert all of the MD files in the directory tree'
+    )
+    parser.add_argument(
+        '--out-dir', metavar='DIRECTORY',
+        help='mirror the converted directory tree into this directory'
+    )
+    parser.add_argument(
+        '--force', action='store_true',
+        help='convert all of the files, even if they did not change'
+    )
+    parser.add_argument(
+        '--split', metavar='FILE',
+        help='cut the MD file into shards in --shard-dir at chunk boundaries'
+    )
+    parser.add_argument(
+        '--shard-size', type=int, default=2 ** 26, metavar='CHARACTERS',
+        help='minimal number of characters of one shard'
+    )
+    parser.add_argument(
+        '--convert-shards', nargs='*', type=int, metavar='NUMBER',
+        help='convert the given shards of --shard-dir, all of them if none '
+             'is given, --jobs processes convert them at once'
+    )
+    parser.add_argument(
+        '--merge', action='store_true',
+        help='concatenate HTML code of the shards of --shard-dir into --output'
+    )
+    parser.add_argument(
+        '--shard-dir', metavar='DIRECTORY',
+        help='directory of the shards and their manifest'
+    )
+    parser.add_argument(
+        '--serve', action='store_true',
+        help='serve length-prefixed conversion requests, --jobs processes '
+             'convert the large ones'
+    )
+    parser.add_argument(
+        '--socket', metavar='PATH', help='Unix socket of the server'
+    )
+    parser.add_argument(
+        '--host', default='127.0.0.1', help='TCP host of the server'
+    )
+    parser.add_argument(
+        '--port', type=int, default=8765, help='TCP port of the server'
+    )
+    arguments = parser.parse_args()
+
+    if arguments.serve:
+        serverController = ServerController.ServerController(
+            arguments.socket, arguments.host, arguments.port, arguments.jobs,
+            work_budget=arguments.work_budget
+        )
+        serverController.run()
+        return
+
+    if (
+        arguments.split is not None or arguments.convert_shards is not None
+        or arguments.merge
+    ):
+        if arguments.shard_dir is None:
+            parser.error('--split, --convert-shards and --merge need '
+                         '--shard-dir')
+        if arguments.merge and arguments.output is None:
+            parser.error('--merge needs --output')
+        shardController = ShardController.ShardController(arguments.shard_dir)
+        if arguments.split is not None:
+            count = shardController.split(
+                arguments.split, arguments.shard_size
+            )
+            print(f'Split into {count} shards', file=sys.stderr)
+        if arguments.convert_shards is not None:
+            count = shardController.convert_shards(
+                arguments.convert_shards or None, arguments.jobs
+            )
+            print(f'Converted {count} shards', file=sys.stderr)
+        if arguments.merge:
+            try:
+                shardController.merge(arguments.output)
+            except ShardController.MissingShardException as error:
+                print(error, file=sys.stderr)
+                sys.exit(1)
+        return
+
+    if arguments.batch is not None:
+        batchController = BatchController.BatchController(
+            arguments.batch, arguments.out_dir, arguments.jobs,
+            arguments.force, arguments.compress, arguments.index
+        )
+        converted, skipped, failed = batchController.convert_directory()
+        for relative_path, error in failed:
+            print(f'{relative_path}: {error}', file=sys.stderr)
+        print(
+            f'Converted {converted} files, skipped {skipped} files, '
+            f'failed {len(failed)} files'
+        )
+        if failed:
+            sys.exit(1)
+        return
+
+    profiler = None
+    if arguments.profile is not None:
+        profiler = StageProfiler.StageProfiler()
+
+    if (
+        arguments.pipe or arguments.file is not None
+        or arguments.stream is not None
+    ):
+        if arguments.compress and arguments.output is None:
+            parser.error('--compress needs --output for the piped input')
+        if arguments.index and arguments.output is None:
+            parser.error('--index needs --output for the piped input')
+        if arguments.index and arguments.stream is not None:
+            parser.error('--index can not be used with --stream')
+        if arguments.mmap and arguments.file is None:
+            parser.error('--mmap needs the input file, the standard input '
+                         'can not be mapped')
+        if arguments.mmap and arguments.stream is not None:
+            parser.error('--mmap can not be used with --stream')
+        inputController = InputController.InputController(
+            is_interactive=False
+        )
+        blocks = [] if arguments.index else None
+        if arguments.stream is not None:
+            dataController = DataController.DataController(
+                None, profiler=profiler, work_budget=arguments.work_budget
+            )
+            fragments = dataController.stream_md_to_html(
+                inputController.iterate_piped_lines(arguments.file),
+                arguments.stream
+            )
+        elif arguments.mmap:
+            if os.path.getsize(arguments.file) == 0:
+                print('No Text!', file=sys.stderr)
+                sys.exit(1)
+            dataController = DataController.DataController(
+                arguments.file, memory_map=True, profiler=profiler,
+                work_budget=arguments.work_budget, encoding='utf-8'
+            )
+            fragments = dataController.generate_md_to_html(
+                arguments.jobs, blocks
+            )
+        else:
+            try:
+                text = inputController.read_piped_input(arguments.file)
+            except InputController.NoTextException:
+                print('No Text!', file=sys.stderr)
+                sys.exit(1)
+            fragments = DataController.convert_iter(
+                text, jobs=arguments.jobs, profiler=profiler,
+                work_budget=arguments.work_budget, blocks=blocks
+            )
+        outputController = OutputController.OutputController(
+            sink=arguments.output
+        )
+        if arguments.compress:
+            fragments = CompressionController.CompressionController(
+                arguments.output, arguments.compress, is_threaded=True
+            ).compress_fragments(fragments)
+        if arguments.index:
+            fragments = IndexController.IndexController(
+                arguments.output, blocks
+            ).index_fragments(fragments)
+        try:
+            outputController.write_html(fragments)
+        except InlineScanner.WorkBudgetException as error:
+            print(error, file=sys.stderr)
+            sys.exit(1)
+    else:
+        inputController = InputController.InputController()
+        inputController.read_user_input()
+
+        dataController = DataController.DataController(
+            memory_map=arguments.mmap, profiler=profiler,
+            work_budget=arguments.work_budget
+        )
+        try:
+            dataController.convert_md_to_html(
+                arguments.jobs, arguments.compress, arguments.index
+            )
+        except InlineScanner.WorkBudgetException as error:
+            print(error, file=sys.stderr)
+            sys.exit(1)
+
+        outputController = OutputController.OutputController()
+        outputController.print_formatted_text()
 
-inputController = InputController.InputController()
-inputController.read_user_input()
+    if profiler is not None:
+        if arguments.profile == 'json':
+            print(profiler.to_json(), file=sys.stderr)
+        else:
+            print(profiler.to_table(), file=sys.stderr)
 
-dataController = DataController.DataController()
-dataController.convert_md_to_html()
 
-outputController = OutputController.OutputController()
-outputController.print_formatted_text()
+if __name__ == '__main__':
+    main()